@@ -5,9 +5,12 @@ The class manages:
 - Loading environment variables from a `.env` file based on the application's environment.
 - Retrieving specific environment variables with default fallbacks.
 - Providing configuration values for the Flask server, such as host, port, and allowed origins.
+- Caching retrieved values, so each environment variable is read and parsed only once.
+- Configuring how many parsed source files are cached in memory.
 
 Dependencies:
 - os: Used for interacting with the operating system to retrieve environment variables.
+- functools: Used for caching retrieved environment values.
 - dotenv: Used for loading environment variables from a `.env` file.
 """
 
@@ -15,6 +18,7 @@ Dependencies:
 
 import os
 import sys
+from functools import lru_cache
 from dotenv import load_dotenv
 
 
@@ -37,8 +41,29 @@ class Env:
         from the `.env` file corresponding to the current environment (development or production).
         """
         load_dotenv(cls.DOTENV_PATH)
+        cls.reset_cache()
 
     @classmethod
+    def reset_cache(cls):
+        """
+        Clear cached environment values.
+
+        Getters read environment variables only once and cache the result. This method makes the
+        next call of each getter read the environment again, e.g. after the `.env` file is loaded
+        or when environment variables are changed in tests.
+        """
+        for getter in (
+            cls.get_flask_run_host,
+            cls.get_flask_run_port,
+            cls.get_origins,
+            cls.get_redis_url,
+            cls.get_max_entries,
+            cls.get_parse_cache_size,
+        ):
+            getter.cache_clear()
+
+    @classmethod
+    @lru_cache(maxsize=1)
     def get_flask_run_host(cls):
         """
         Get the Flask server host from environment variables.
@@ -51,6 +76,7 @@ class Env:
         return os.getenv("FLASK_RUN_HOST", "0.0.0.0")
 
     @classmethod
+    @lru_cache(maxsize=1)
     def get_flask_run_port(cls):
         """
         Get the Flask server port from environment variables.
@@ -63,6 +89,7 @@ class Env:
         return os.getenv("FLASK_RUN_PORT", 8080)
 
     @classmethod
+    @lru_cache(maxsize=1)
     def get_origins(cls):
         """
         Get the list of allowed origins for CORS from environment variables.
@@ -76,6 +103,7 @@ class Env:
         return origins.split(",")
 
     @classmethod
+    @lru_cache(maxsize=1)
     def get_redis_url(cls):
         """
         Get the Redis URL from environment variables.
@@ -88,6 +116,7 @@ class Env:
         return os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
     @classmethod
+    @lru_cache(maxsize=1)
     def get_max_entries(cls):
         """
         Get the maximum number of entries to process from environment variables. Works on spliceai and cadd.
@@ -101,3 +130,23 @@ class Env:
             return int(os.getenv("MAX_ENTRIES", str(sys.maxsize)))
         except ValueError as e:
             raise ValueError(f"Invalid value for MAX_ENTRIES: {os.getenv('MAX_ENTRIES')}. It must be an integer or unset.") from e
+
+    @classmethod
+    @lru_cache(maxsize=1)
+    def get_parse_cache_size(cls):
+        """
+        Get the number of parsed source files kept in memory per parser from environment variables.
+
+        Each cached result holds a whole parsed file, so larger values trade memory of every worker
+        for skipping repeated parsing of unchanged files. Zero disables the cache.
+
+        Returns:
+            int: The number of cached results per parser, defaulting to 1.
+        """
+        try:
+            return max(0, int(os.getenv("PARSE_CACHE_SIZE", "1")))
+        except ValueError as e:
+            raise ValueError(
+                f"Invalid value for PARSE_CACHE_SIZE: {os.getenv('PARSE_CACHE_SIZE')}. "
+                "It must be an integer or unset."
+            ) from e
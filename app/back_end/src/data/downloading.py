@@ -1,6 +1,7 @@
 """ Module providing a functionality to collect data from various sources """
 
 import glob
+import io
 import logging
 import os
 import time
@@ -24,7 +25,8 @@ from .constants import (LOVD_FILE_URL,
                         STORE_AS_GNOMAD,
                         STORE_AS_CLINVAR)
 from .refactoring import (parse_lovd,
-                        parse_clinvar)
+                        parse_clinvar,
+                        iter_variation_archives)
 from .helpers import (construct_clinvar_gene_identifiers_url,
                       contruct_clinvar_summaries_url,
                       write_to_csv)
@@ -441,9 +443,7 @@ def download_clinvar_database_for_eys_gene(save_to:str = STORE_AS_CLINVAR, overr
                                         f" Status code: {response.status_code}")
         
         # Parse summaries XML
-        root = ET.fromstring(response.text)
-        variation_archives = root.findall("VariationArchive")
-        parse_clinvar(rows, variation_archives) 
+        parse_clinvar(rows, iter_variation_archives(io.BytesIO(response.content)))
 
     # Write the data to a CSV file
     write_to_csv(columns, rows, save_to)
\ No newline at end of file
@@ -1,18 +1,180 @@
 """ Module dedicated for refactoring collected data for further processing """
+# pylint: disable=too-many-lines
 
 import os
 import logging
 import re
+import inspect
+from collections import OrderedDict
+from collections.abc import Iterable
+from functools import wraps
 
-
-import pandas as pd
 import xml.etree.ElementTree as ET
-from pandas import DataFrame
 from datetime import datetime
 
-from pyliftover import LiftOver
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from gevent import monkey
+from pandas import DataFrame
 
 from .constants import LOVD_PATH, GNOMAD_PATH, CLINVAR_PATH
+from ..config import Env
+
+_LIFTOVER = None
+_GNOMAD_RE = re.compile(r'^g\.(\d+)(?:(dup|del)|([A-Z])>([A-Z]))$')
+_PROTEIN_SUFFIX_RE = re.compile(r'.?p\..*$')
+_CDNA_RE = re.compile(r'^(?:[^:]*:)?(.*?(?:delins|del|dup|ins|inv|subst)|.*)')
+_SPDI_RE = re.compile(r'^([^:]*):([^:]*):([^:]*):([^:]*)$')
+# LOVD values converted to numbers: integers and floats written with a '.', 'E-' or 'E+'
+_LOVD_NUMBER_RE = re.compile(r'[+-]?(?:\d+|(?:\d+\.\d*|\.\d+)(?:[eE][+-]?\d+)?|\d+E[+-]\d+)')
+_CLINVAR_NAME_RE = re.compile(r'^(?:.*?:(?P<dna>c\.[^ ]+))?(?:.*? \((?P<protein>p\.[^)]*)\))?')
+
+# Columns with few distinct values, stored as categories to save memory
+_LOVD_CATEGORY_COLUMNS = (
+    "VariantOnGenome/ClinicalClassification",
+    "VariantOnGenome/ClinicalClassification/Method",
+)
+_GNOMAD_CATEGORY_COLUMNS = ("Popmax population",)
+_CLINVAR_CATEGORY_COLUMNS = (
+    "Gene(s)",
+    "Variant type",
+    "Molecular consequence",
+    "Germline classification",
+    "Germline review status",
+)
+
+# Types of text columns in gnomAD and ClinVar files, read without type inference
+_GNOMAD_COLUMN_TYPES = {
+    column: pa.string()
+    for column in ("gnomAD ID", "variant_id", "cDNA change", "Protein change", "Popmax population")
+}
+_CLINVAR_COLUMN_TYPES = {
+    column: pa.string()
+    for column in (
+        "Name", "Gene(s)", "Protein change", "Condition(s)", "Accession", "dbSNP ID",
+        "Canonical SPDI", "Variant type", "Molecular consequence", "Germline classification",
+        "Germline review status", "Germline date last evaluated"
+    )
+}
+
+
+def _freeze(value):
+    """
+    Convert value to hashable form, so it can be part of a cache key.
+
+    :param value: value of function argument
+    :returns: hashable value
+    """
+
+    if isinstance(value, dict):
+        return tuple((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _shallow_copy(result):
+    """
+    Copy parsed data so callers can replace its columns without changing cached data.
+
+    :param result: DataFrame or dictionary of DataFrames
+    :returns: shallow copy of result
+    """
+
+    if isinstance(result, dict):
+        return {name: frame.copy(deep=False) for name, frame in result.items()}
+    return result.copy(deep=False)
+
+
+def cache_by_file_stat(maxsize: int | None = None):
+    """
+    Cache results of a file parsing function.
+
+    Cache key consists of the function arguments and the parsed file modification time and size,
+    so a replaced or changed file is parsed again. The first argument of decorated function must
+    be the path to the file. Each call returns a shallow copy of the cached result.
+
+    Cached results are whole parsed files kept in memory for the lifetime of the worker, so the
+    cache is small by default and only functions without side effects may be decorated, since a
+    cache hit skips the call.
+
+    The cache is shared by native threads parsing files concurrently, so it's guarded by a lock
+    from the standard library, which isn't replaced by gevent. The lock isn't held while parsing.
+
+    :param int maxsize: maximum number of cached results, least recently used are dropped first.
+                        If None, `PARSE_CACHE_SIZE` environment variable is used, see
+                        `Env.get_parse_cache_size`. Zero disables the cache.
+    :returns: decorator
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        cache = OrderedDict()
+        lock = monkey.get_original("threading", "Lock")()
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            limit = Env.get_parse_cache_size() if maxsize is None else maxsize
+            if limit <= 0:
+                with lock:
+                    cache.clear()
+                return func(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            path = next(iter(bound.arguments.values()))
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return func(*args, **kwargs)
+
+            key = (stat.st_mtime_ns, stat.st_size, _freeze(bound.arguments))
+            with lock:
+                cached = cache.get(key)
+                if cached is not None:
+                    cache.move_to_end(key)
+            if cached is not None:
+                return _shallow_copy(cached)
+
+            result = func(*args, **kwargs)
+            with lock:
+                cache[key] = result
+                while len(cache) > limit:
+                    cache.popitem(last=False)
+            return _shallow_copy(result)
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
+
+
+def _convert_dtypes(df: pd.DataFrame, source: str, categories: Iterable[str] = ()) -> pd.DataFrame:
+    """
+    Convert columns of given DataFrame to the best possible dtypes.
+
+    :param DataFrame df: DataFrame to convert
+    :param str source: name of the data source used in error message
+    :param Iterable[str] categories: columns to convert to category dtype, if present
+    :returns: DataFrame with converted dtypes
+    :rtype: DataFrame
+    :raises Exception: if there is an error during data type conversion
+    """
+
+    try:
+        df = df.convert_dtypes()
+        for column in categories:
+            if column in df.columns:
+                df[column] = df[column].astype("category")
+        return df
+    except Exception as e:
+        raise Exception(f"Failed to convert {source} data types: {e}") from e
 
 
 def set_lovd_dtypes(df_dict: dict[str, pd.DataFrame]):
@@ -23,84 +185,81 @@ def set_lovd_dtypes(df_dict: dict[str, pd.DataFrame]):
     """
 
     for table_name, frame in df_dict.items():
-        try:
-            frame = frame.convert_dtypes()
-        except Exception as e:
-            raise Exception(f"Failed to convert data types for LOVD table '{table_name}': {e}") from e
-        df_dict[table_name] = frame
+        df_dict[table_name] = _convert_dtypes(
+            frame, f"LOVD table '{table_name}'", _LOVD_CATEGORY_COLUMNS
+        )
 
-def set_gnomad_dtypes(df:pd.DataFrame):
+
+def set_gnomad_dtypes(df:pd.DataFrame) -> pd.DataFrame:
     """
     Convert data from gnomAD format table to desired data format based on specified data types.
 
     :param DataFrame df: DataFrame containing gnomAD data
-    :raises GnomadDtypeConversionError: if there is an error during data type conversion
+    :returns: DataFrame with converted dtypes
+    :rtype: DataFrame
+    :raises Exception: if there is an error during data type conversion
     """
-    try:
-        df.convert_dtypes()
-    except Exception as e:
-        raise Exception(f"Failed to convert gnomAD data types: {e}") from e
+
+    return _convert_dtypes(df, "gnomAD", _GNOMAD_CATEGORY_COLUMNS)
 
 
-def set_clinvar_dtypes(df:pd.DataFrame):
+def set_clinvar_dtypes(df:pd.DataFrame) -> pd.DataFrame:
     """
     Convert data from ClinVar format table to desired data format based on specified data types.
 
     :param DataFrame df: DataFrame containing Clinvar data
-    :raises ClinVarDtypeConversionError: if there is an error during data type conversion
+    :returns: DataFrame with converted dtypes
+    :rtype: DataFrame
+    :raises Exception: if there is an error during data type conversion
     """
-    try:
-        df.convert_dtypes()
-    except Exception as e:
-        raise Exception(f"Failed to convert Clinvar data types: {e}") from e
+
+    return _convert_dtypes(df, "Clinvar", _CLINVAR_CATEGORY_COLUMNS)
 
 
-def set_custom_file_dtypes(df:pd.DataFrame):
+def set_custom_file_dtypes(df:pd.DataFrame) -> pd.DataFrame:
     """
     Convert data from custom_file format table to desired data format based on specified data types.
 
     :param DataFrame df: DataFrame containing custom_file data
-    :raises DtypeConversionError: if there is an error during data type conversion
+    :returns: DataFrame with converted dtypes
+    :rtype: DataFrame
+    :raises Exception: if there is an error during data type conversion
     """
-    try:
-        df.convert_dtypes()
-    except Exception as e:
-        raise Exception(f"Failed to convert custom_file data types: {e}") from e
+
+    return _convert_dtypes(df, "custom_file")
 
 
-def infer_type(value:str):
+def infer_column_type(column: pd.Series) -> pd.Series:
     """
-    Infer the type of given value based on its content.
-   This function attempts to convert the input value into an
-   integer or a float based on its string representation. If the
-   conversion is not possible, it returns the original value as a
-   string.
-    Args:
-        value: The value to infer the type for, expected to be a string.
+    Infer the type of given column based on its content.
 
-    Returns: The value converted to int, float, or string based on the inferred type.
+    Column is converted to integers or floats if all of its values are numbers, otherwise
+    (including empty columns and columns with empty values) it is returned unchanged as strings.
+    Only plain integers and floats written with a '.', 'E-' or 'E+' are numbers, so values such
+    as 'nan', 'inf' or '1e5' are kept as strings.
+
+    :param Series column: column of string values
+    :returns: column converted to numeric type or the original column
+    :rtype: Series
     """
-    try:
-        if '.' in value or 'E-' in value or 'E+' in value:
-            return float(value)
-        else:
-            return int(value)
-    except ValueError:
-        return value  # Return as string if it cannot be converted
+    if column.empty or not column.astype(str).str.fullmatch(_LOVD_NUMBER_RE).all():
+        return column
+    return pd.to_numeric(column)
 
 
-def parse_lovd(path: str = LOVD_PATH + '/lovd_data.txt', save_to: str = LOVD_PATH):
+@cache_by_file_stat()
+def read_lovd(path: str, columns: dict[str, list[str]] | None = None):
     """
-    Converts data from text file with LOVD format to dictionary of tables.
+    Reads text file with LOVD format into dictionary of tables without saving them.
 
     Key is name of table, value is data saved as pandas DataFrame.
     Notes for each table are displayed with log.
 
-    **IMPORTANT:** It doesn't provide types for data inside. Use set_lovd_dtypes for this.
-
     :param str path: path to text file
+    :param dict[str, list[str]] columns: columns to keep for given tables, other tables keep
+                                         all columns
     :returns: dictionary of tables
-    :rtype: dict[str, tuple[DataFrame, list[str]]]
+    :rtype: dict[str, DataFrame]
     """
 
     # Check if the file exists
@@ -138,30 +297,111 @@ def parse_lovd(path: str = LOVD_PATH + '/lovd_data.txt', save_to: str = LOVD_PAT
                 logging.info("[%s]%s", table_name, notes)
 
             table_header = [column[3:-3] for column in line[:-1].split('\t')]
-            frame = DataFrame([], columns=table_header)
+            rows = []
             line = f.readline()
-            while line != '\n':
-                variables = [variable[1:-1] for variable in line[:-1].split('\t')]
-                observation = DataFrame([variables], columns=table_header)
-                frame = pd.concat([frame, observation], ignore_index=True)
-                line = f.readline()
+            if columns and table_name in columns:
+                indexes = [table_header.index(column) for column in columns[table_name]
+                           if column in table_header]
+                table_header = [table_header[i] for i in indexes]
+                while line != '\n':
+                    variables = line[:-1].split('\t')
+                    rows.append([variables[i][1:-1] for i in indexes])
+                    line = f.readline()
+            else:
+                while line != '\n':
+                    rows.append([variable[1:-1] for variable in line[:-1].split('\t')])
+                    line = f.readline()
+            frame = DataFrame(rows, columns=table_header)
+
+            d[table_name] = frame.apply(infer_column_type)
 
-            for col in frame.columns:
-                frame[col] = frame[col].apply(infer_type)
+            # skip inter tables lines
+            [f.readline() for _ in range(1)]  # pylint: disable=expression-not-assigned
 
-            d[table_name] = frame
+    return d
 
-            file_location = os.path.join(save_to, f"{table_name}.csv")
-            if not os.path.exists(save_to):
-                os.makedirs(save_to)
-            frame.to_csv(file_location, index=False)
 
-            # skip inter tables lines
-            [f.readline() for _ in range(1)]  # pylint: disable=expression-not-assigned
+def parse_lovd(
+    path: str = LOVD_PATH + '/lovd_data.txt',
+    save_to: str | None = LOVD_PATH,
+    columns: dict[str, list[str]] | None = None
+):
+    """
+    Converts data from text file with LOVD format to dictionary of tables.
+
+    Key is name of table, value is data saved as pandas DataFrame.
+    Notes for each table are displayed with log. Parsed tables are cached by `read_lovd`,
+    tables are saved on every call.
+
+    **IMPORTANT:** It doesn't provide types for data inside. Use set_lovd_dtypes for this.
+
+    :param str path: path to text file
+    :param str save_to: path to directory where each table is saved as CSV file, if None,
+                        tables aren't saved
+    :param dict[str, list[str]] columns: columns to keep for given tables, other tables keep
+                                         all columns. Saved tables contain only kept columns,
+                                         so pass None as save_to to keep saved tables complete.
+    :returns: dictionary of tables
+    :rtype: dict[str, tuple[DataFrame, list[str]]]
+    """
+
+    d = read_lovd(path, columns)
+
+    if save_to is not None:
+        os.makedirs(save_to, exist_ok=True)
+        for table_name, frame in d.items():
+            write_csv_file(frame, os.path.join(save_to, f"{table_name}.csv"))
 
     return d
 
 
+def read_csv_file(path: str, column_types: dict[str, pa.DataType] | None = None) -> pd.DataFrame:
+    """
+    Reads comma separated file into a pandas DataFrame using multithreaded pyarrow parser.
+    Columns keep default numpy backed dtypes, so the result can be merged with other sources.
+
+    :param str path: path to the CSV file
+    :param dict[str, DataType] column_types: known types of columns, their inference is skipped.
+                                            Types of other columns are inferred.
+    :returns: pandas DataFrame containing file data
+    :rtype: pd.DataFrame
+    """
+
+    # Memory mapped file is read from the page cache without copying it into Python buffers
+    with pa.memory_map(path, "r") as source:
+        table = pa_csv.read_csv(
+            source,
+            read_options=pa_csv.ReadOptions(block_size=16 << 20, use_threads=True),
+            convert_options=pa_csv.ConvertOptions(
+                column_types=column_types or {}, strings_can_be_null=True
+            ),
+        )
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def write_csv_file(frame: pd.DataFrame, path: str):
+    """
+    Writes pandas DataFrame to comma separated file without index using pyarrow writer.
+    Falls back to pandas writer for columns pyarrow cannot convert, e.g. mixed types.
+
+    :param DataFrame frame: data to save
+    :param str path: path to the CSV file
+    """
+
+    try:
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        # CSV writer doesn't support dictionary encoded (categorical) columns
+        table = table.cast(pa.schema([
+            field.with_type(field.type.value_type) if pa.types.is_dictionary(field.type) else field
+            for field in table.schema
+        ]))
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        frame.to_csv(path, index=False)
+        return
+    pa_csv.write_csv(table, path)
+
+
+@cache_by_file_stat()
 def parse_gnomad(path:str=GNOMAD_PATH + '/gnomad_data.csv'):
     """
     Parses data from a gnomAD format text file into a pandas DataFrame.
@@ -176,16 +416,17 @@ def parse_gnomad(path:str=GNOMAD_PATH + '/gnomad_data.csv'):
         raise FileNotFoundError(f"The file at {path} does not exist.")
     logging.info("Parsing file %s using parse_gnomad.", path)
     try:
-        gnomad_data = pd.read_csv(path, sep=',', encoding='UTF-8')
+        gnomad_data = read_csv_file(path, _GNOMAD_COLUMN_TYPES)
         return gnomad_data
     except Exception as e:
         logging.error("Error parsing gnomAD data: %s", str(e))
         raise e
 
 
+@cache_by_file_stat()
 def parse_custom_file(path: str):
     """
-    Parses data from a file (CSV or XLSX) into a pandas DataFrame.
+    Parses data from a file (CSV, XLSX or Parquet) into a pandas DataFrame.
 
     :param str path: path to the data file
     :returns: pandas DataFrame containing data
@@ -200,15 +441,20 @@ def parse_custom_file(path: str):
         if path.endswith(".xlsx") or path.endswith(".xls"):
             data = pd.read_excel(path, engine="openpyxl")
         elif path.endswith(".csv"):
-            data = pd.read_csv(path, sep=',', encoding='UTF-8')
+            data = read_csv_file(path)
+        elif path.endswith(".parquet"):
+            data = pd.read_parquet(path)
         else:
-            raise ValueError("Unsupported file format. Only .csv and .xlsx files are allowed.")
+            raise ValueError(
+                "Unsupported file format. Only .csv, .xlsx and .parquet files are allowed."
+            )
         return data
     except Exception as e:
         logging.error("Error parsing file data: %s", str(e))
         raise e
 
 
+@cache_by_file_stat()
 def clinvar_file_parse(path:str=CLINVAR_PATH + '/clinvar_data.csv'):
     """
     Parses data from a ClinVar format text file into a pandas DataFrame.
@@ -222,7 +468,7 @@ def clinvar_file_parse(path:str=CLINVAR_PATH + '/clinvar_data.csv'):
         raise FileNotFoundError(f"The file at {path} does not exist.")
     logging.info("Parsing file %s using parse_clinvar.", path)
     try:
-        clinvar_data = pd.read_csv(path, sep=',', encoding='UTF-8')
+        clinvar_data = read_csv_file(path, _CLINVAR_COLUMN_TYPES)
         return clinvar_data
     except Exception as e:
         logging.error("Error parsing ClinVar data: %s", str(e))
@@ -238,20 +484,8 @@ def from_clinvar_name_to_cdna_position(name:str):
     :rtype: str
     """
 
-    start = name.find(":") + 1
-    ends = {'del', 'delins', 'dup', 'ins', 'inv', 'subst'}
-
-    if "p." in name:
-        name = name[:name.index("p.") - 1].strip()
-
-    end = len(name)
-
-    for i in ends:
-        if i in name:
-            end = name.index(i) + len(i)
-            break
-
-    return name[start:end]
+    name = _PROTEIN_SUFFIX_RE.sub('', name, count=1).strip()
+    return _CDNA_RE.match(name).group(1)
 
 
 def lovd_fill_hg38(lovd: pd.DataFrame):
@@ -260,6 +494,8 @@ def lovd_fill_hg38(lovd: pd.DataFrame):
     by converting hg19 values to hg38.
     New column 'hg38_gnomad_format' is added to store
     the converted positions in the format '6-position-ref-alt'.
+    Duplications and deletions are stored as '6-position-dup' and '6-position-del',
+    interval ranges and invalid values as '?'.
     :param lovd: pandas DataFrame containing following columns:
                - 'VariantOnGenome/DNA': hg19 values.
                - 'VariantOnGenome/DNA/hg38': hg38 values.
@@ -271,66 +507,54 @@ def lovd_fill_hg38(lovd: pd.DataFrame):
         return
     lovd.loc[:,'hg38_gnomad_format'] = lovd.loc[:,'VariantOnGenome/DNA/hg38'].replace('', pd.NA)
     missing_hg38_mask = lovd.loc[:,'hg38_gnomad_format'].isna()
-    lovd.loc[missing_hg38_mask, 'hg38_gnomad_format'] = (lovd.loc[missing_hg38_mask,
-                                                                'VariantOnGenome/DNA'].
-                                                         apply(convert_hg19_if_missing))
-    lovd.loc[:,'hg38_gnomad_format'] = lovd.loc[:,'hg38_gnomad_format'].apply(convert_to_gnomad_gen)
+    if missing_hg38_mask.any():
+        lovd.loc[missing_hg38_mask, 'hg38_gnomad_format'] = convert_hg19_series(
+            lovd.loc[missing_hg38_mask, 'VariantOnGenome/DNA']
+        )
+
+    parts = lovd.loc[:,'hg38_gnomad_format'].astype(object).str.extract(_GNOMAD_RE)
+    lovd.loc[:,'hg38_gnomad_format'] = (
+        ("6-" + parts[0] + "-" + parts[1])
+        .fillna("6-" + parts[0] + "-" + parts[2] + "-" + parts[3])
+        .fillna("?")
+    )
 
 
-def convert_hg19_if_missing(hg19: str, lo = LiftOver('hg19', 'hg38')):
+def _get_liftover():
     """
-    Converts hg19 variant to hg38 if hg38 is missing.
-    :param hg19: a row from the DataFrame.
-    :param lo: converter for genomic data between reference assemblies
-    :return: hg38 value or a conversion of the hg19 value in the format 'g.positionref>alt'.
+    Returns module level hg19 to hg38 converter, creating it on first use.
+    Loading the chain file is expensive, so it is done only once per process.
+    :return: converter for genomic data between reference assemblies
     """
 
-    if pd.isna(hg19) or '_' in hg19:
-        return "?"
+    global _LIFTOVER  # pylint: disable=global-statement
+    if _LIFTOVER is None:
+        from pyliftover import LiftOver  # pylint: disable=import-outside-toplevel
+        _LIFTOVER = LiftOver('hg19', 'hg38')
+    return _LIFTOVER
 
-    match = re.search(r'g\.(\d+)', hg19)
-    if not match:
-        return '?'
 
-    position_str = match.group(1)
-    new_pos = lo.convert_coordinate('chr6', int(position_str))[0][1]
-    return f"g.{new_pos}{hg19[-3:]}"
-
-
-
-def convert_to_gnomad_gen(variant: str):
+def convert_hg19_series(hg19: pd.Series) -> pd.Series:
     """
-    converts a variant string from hg38 format
-    to the format used by gnomAD ('6-position-ref-alt').
-    :param variant: str: the variant in the format 'g.startRef>Alt'.
-    :return: str: variant formatted as '6-position-ref-alt'
-    or '?' if the input contains interval ranges or is invalid.
+    Converts a column of hg19 variants to hg38 in the format 'g.positionref>alt'.
+    Each unique position is lifted over only once.
+    :param hg19: Series of hg19 values.
+    :return: Series of converted values, '?' where conversion is not possible.
     """
 
-    patterns = {
-        'dup': re.compile(r'^g\.(\d+)dup$'),
-        'del': re.compile(r'^g\.(\d+)del$'),
-        'ref_alt': re.compile(r'^g\.(\d+)([A-Z])>([A-Z])$')
-    }
-
-    match = patterns['dup'].match(variant)
-    if match:
-        position = match.group(1)
-        return f"6-{position}-dup"
-
-    match = patterns['del'].match(variant)
-    if match:
-        position = match.group(1)
-        return f"6-{position}-del"
+    hg19 = hg19.astype(object)
+    positions = hg19.str.extract(r'g\.(\d+)', expand=False)
+    positions = positions.mask(hg19.str.contains('_', regex=False, na=True))
 
-    match = patterns['ref_alt'].match(variant)
-    if match:
-        position = match.group(1)
-        ref = match.group(2)
-        alt = match.group(3)
-        return f"6-{position}-{ref}-{alt}"
+    lo = _get_liftover()
+    mapping = {}
+    for position in positions.dropna().unique():
+        converted = lo.convert_coordinate('chr6', int(position))
+        if converted:
+            mapping[position] = str(converted[0][1])
 
-    return "?"
+    converted_positions = positions.map(mapping)
+    return ("g." + converted_positions + hg19.str[-3:]).fillna("?")
 
 
 def merge_gnomad_lovd(lovd:pd.DataFrame, gnomad:pd.DataFrame):
@@ -412,11 +636,10 @@ def custom_data_fill_hg38(custom_data: pd.DataFrame):
 
     if custom_data.empty:
         return
-    custom_data["hg38_data"] = (
-        custom_data["Chromosome"].str.replace("chr", "", regex=True) + "-" +
-        custom_data["Position"].astype(str) + "-" +
-        custom_data["REF"] + "-" +
-        custom_data["ALT"]
+    chromosome = custom_data["Chromosome"].str.replace("chr", "", regex=False)
+    custom_data["hg38_data"] = chromosome.str.cat(
+        [custom_data["Position"].astype(str), custom_data["REF"], custom_data["ALT"]],
+        sep="-"
     )
     return custom_data
 
@@ -451,15 +674,17 @@ def merge_lovd_clinvar(lovd:pd.DataFrame, clinvar:pd.DataFrame):
         right_on="hg38_ID_clinvar"
     )
 
+    names = merged_frame['Name_clinvar'].astype(str).str.extract(_CLINVAR_NAME_RE)
     merged_frame['VariantOnTranscript/DNA'] = merged_frame['VariantOnTranscript/DNA'].fillna(
-        merged_frame['Name_clinvar'].astype(str).str.extract(r':(c\.[^ ]+)')[0]
+        names['dna']
     )
-
-    merged_frame['VariantOnTranscript/Protein'] = merged_frame['VariantOnTranscript/Protein'].fillna(
-        merged_frame['Name_clinvar'].astype(str).str.extract(r'\ \((p\.[^)]*)\)')[0]
+    merged_frame['VariantOnTranscript/Protein'] = (
+        merged_frame['VariantOnTranscript/Protein'].fillna(names['protein'])
     )
 
-    merged_frame['malformed'] = merged_frame['Name_clinvar'].where(merged_frame['VariantOnTranscript/DNA'].isna())
+    merged_frame['malformed'] = merged_frame['Name_clinvar'].where(
+        merged_frame['VariantOnTranscript/DNA'].isna()
+    )
 
 
     return merged_frame
@@ -469,6 +694,10 @@ def transform_spdi_to_format(df, spdi_column="Canonical SPDI", new_column="hg38_
     """
     Transforms the SPDI format in a given column to the desired format.
 
+    SPDI values "chromosome:position:ref:alt" are formatted as "chromosome-position-ref-alt".
+    "NC_" prefix, version number and leading zeroes are removed from the chromosome, e.g.
+    "NC_000006.12" becomes "6". Values that don't consist of four parts are set to None.
+
     Args:
         df (pd.DataFrame): The DataFrame containing the SPDI column.
         spdi_column (str): The name of the column with SPDI format.
@@ -478,37 +707,18 @@ def transform_spdi_to_format(df, spdi_column="Canonical SPDI", new_column="hg38_
         pd.DataFrame: The updated DataFrame with the new column.
     """
     df[spdi_column] = df[spdi_column].astype(str)
-    df[new_column] = df[spdi_column].apply(format_spdi)
+    parts = df[spdi_column].str.extract(_SPDI_RE)
+    # Only a few distinct sequence identifiers exist, so each is cleaned once and mapped
+    chromosomes = {
+        sequence: sequence.replace("NC_", "").split(".")[0].lstrip("0")
+        for sequence in parts[0].dropna().unique()
+    }
+    chromosome = parts[0].map(chromosomes).astype(object)
+    formatted = chromosome.str.cat([parts[1], parts[2], parts[3]], sep="-")
+    df[new_column] = formatted.where(formatted.notna(), None)
     return df
 
 
-def format_spdi(row) -> str | None:
-    """
-    Formats a given SPDI (Sequence, Position, Deletion, Insertion) string into a standardized format.
-    The function expects the input string in the form of "chromosome:position:ref:alt",
-    where:
-     - chromosome is the chromosome identifier, potentially prefixed with "NC_" and containing a version number (e.g., "NC_000001.11").
-     - position is the position of the mutation on the chromosome.
-     - ref is the reference nucleotide.
-     - alt is the alternate nucleotide.
-
-    The function processes the chromosome by removing the "NC_" prefix and any version number after the dot,
-    and strips any leading zeroes. It then returns the string formatted as "chromosome-position-ref-alt".
-
-    If the input string is not properly formatted or cannot be split into the four expected components, the function returns None.
-
-    params: row (str): A string representing the SPDI, formatted as "chromosome:position:ref:alt".
-
-    returns (str or None): A formatted string in the form "chromosome-position-ref-alt", or None if the input is invalid.
-    """
-    try:
-        chromosome, position, ref, alt = row.split(":")
-        chromosome = chromosome.replace("NC_", "").split(".")[0].lstrip("0")
-        return f"{chromosome}-{position}-{ref}-{alt}"
-    except ValueError:
-        return None
-
-
 def save_lovd_as_vcf(data:pd.DataFrame, save_to:str="./lovd.vcf"):
     """
     Gets hg38 variants from LOVD and saves as VCF file.
@@ -520,22 +730,29 @@ def save_lovd_as_vcf(data:pd.DataFrame, save_to:str="./lovd.vcf"):
         raise ValueError("VariantOnGenome/DNA/hg38 is not in the LOVD DataFrame.")
 
     save_to_dir = os.path.dirname(save_to)
-    if not os.path.exists(save_to_dir):
-        os.makedirs(save_to_dir)
+    if save_to_dir:
+        os.makedirs(save_to_dir, exist_ok=True)
+
+    variants = df.loc[:, "VariantOnGenome/DNA/hg38"].astype(str)
+    # valid variants look like 'g.12345678A>G', check length and 12th character on fixed width array
+    values = variants.to_numpy(dtype=str)
+    characters = values.astype('U13').view('U1').reshape(-1, 13)
+    valid_mask = (np.char.str_len(values) == 13) & (characters[:, 11] == '>')
+    valid = variants[valid_mask]
+
+    skipped = variants[~valid_mask]
+    if not skipped.empty:
+        logging.warning("Skipping %d variants: %s", len(skipped), skipped.tolist())
+
+    records = ("6\t" + valid.str[2:-3] + "\t.\t" + valid.str[-3] + "\t" + valid.str[-1] +
+               "\t.\t.\t.\n")
 
     with open(save_to, "w", encoding="UTF-8") as f:
         header = ("##fileformat=VCFv4.2\n"
                   "##contig=<ID=6,length=63719980>\n"
                   "#CHROM	POS	ID	REF	ALT	QUAL	FILTER	INFO\n")
         f.write(header)
-        for variant in df.loc[:, "VariantOnGenome/DNA/hg38"]:
-            if len(variant) != 13 or variant[-2] != '>':
-                logging.warning("Skipping variant %s", variant)
-                continue
-            record = ["6", variant[2:-3], ".", variant[-3], variant[-1], ".", ".", "."]
-
-            f.write("\t".join(record))
-            f.write("\n")
+        f.writelines(records)
 
 
 def find_popmax_in_gnomad(data:pd.DataFrame):
@@ -559,120 +776,191 @@ def find_popmax_in_gnomad(data:pd.DataFrame):
         }
     population_ids = ['afr', 'eas', 'asj', 'sas', 'nfe', 'fin', 'mid', 'amr', 'ami', 'remaining']
 
-    for i in range(data.shape[0]):
-        max_pop = 0
-        max_id = ''
-        for population_id in population_ids:
-            if data.loc[i, f'Allele_Frequency_{population_id}'] > max_pop:
-                max_pop = data.loc[i, f'Allele_Frequency_{population_id}']
-                max_id = population_id
-        data.loc[i, 'Popmax'] = max_pop
-        data.loc[i, 'Popmax population'] = population_mapping[max_id]
+    frequency_columns = [f'Allele_Frequency_{population_id}' for population_id in population_ids]
+    frequencies = data[frequency_columns].astype(float).fillna(0)
+
+    popmax = frequencies.max(axis=1).clip(lower=0)
+    popmax_ids = frequencies.idxmax(axis=1).str.removeprefix('Allele_Frequency_')
+
+    data['Popmax'] = popmax
+    data['Popmax population'] = popmax_ids.map(population_mapping).where(popmax > 0, '')
+
+
+def iter_variation_archives(source):
+    """
+    Iterates over ClinVar `VariationArchive` elements while parsing XML incrementally.
+
+    Each element is cleared and removed from its parent after it has been processed, so only
+    one record is kept in memory at a time.
+
+    :param source: file name or file object containing ClinVar XML
+    :returns: generator of `VariationArchive` elements
+    """
+
+    # Currently open elements, the last one is the parent of the next finished element
+    parents = []
+    for event, element in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            parents.append(element)
+            continue
+        parents.pop()
+        if element.tag == "VariationArchive":
+            yield element
+            element.clear()
+            if parents:
+                parents[-1].remove(element)
+
 
+def _format_location(sequence_location: ET.Element | None) -> str:
+    """
+    Formats ClinVar sequence location as 'start - stop', or 'start' if both are equal.
+    :param sequence_location: `SequenceLocation` element or None
+    :return: formatted location or empty string
+    """
+
+    if sequence_location is None:
+        return ""
+    start = sequence_location.attrib.get("display_start")
+    end = sequence_location.attrib.get("display_stop")
+    if start is not None and end is not None and start != end:
+        return f"{start} - {end}"
+    return start if start is not None else ""
+
+
+def _text(element: ET.Element | None) -> str:
+    """
+    Returns text of given element, or empty string if the element is missing or has no text.
+    :param element: XML element or None
+    :return: element text
+    """
+
+    return (element.text or "") if element is not None else ""
+
+
+def _attribute(element: ET.Element | None, name: str) -> str:
+    """
+    Returns attribute of given element, or empty string if the element or attribute is missing.
+    :param element: XML element or None
+    :param name: attribute name
+    :return: attribute value
+    """
+
+    return element.attrib.get(name, "") if element is not None else ""
+
+
+def _clinvar_location_fields(simple_allele: ET.Element) -> list[str]:
+    """
+    Returns chromosome and location of the allele on GRCh37 and GRCh38 assemblies.
+    :param simple_allele: `SimpleAllele` element
+    :return: GRCh37 chromosome, GRCh37 location, GRCh38 chromosome and GRCh38 location
+    """
+
+    sequence_locations = {}
+    for sequence_location in simple_allele.findall("Location/SequenceLocation"):
+        sequence_locations.setdefault(sequence_location.attrib.get("Assembly"), sequence_location)
+
+    fields = []
+    for assembly in ("GRCh37", "GRCh38"):
+        sequence_location = sequence_locations.get(assembly)
+        fields.append(_attribute(sequence_location, "Chr"))
+        fields.append(_format_location(sequence_location))
+    return fields
+
+
+def _clinvar_classification_fields(germline_classification: ET.Element | None) -> list[str]:
+    """
+    Returns germline classification fields of a ClinVar record.
+    :param germline_classification: `GermlineClassification` element or None
+    :return: germline classification, review status and date last evaluated
+    """
+
+    if germline_classification is None:
+        return ["", "", ""]
+    date_last_evaluated = germline_classification.attrib.get("DateLastEvaluated")
+    return [
+        _text(germline_classification.find("Description")),
+        _text(germline_classification.find("ReviewStatus")),
+        datetime.strptime(date_last_evaluated, "%Y-%m-%d").strftime("%b %d, %Y")
+        if date_last_evaluated is not None else "",
+    ]
+
+
+def _clinvar_row(element: ET.Element) -> list[str]:
+    """
+    Converts ClinVar `VariationArchive` element to a row of ClinVar CSV export columns.
+    :param element: `VariationArchive` element
+    :return: row values
+    """
+
+    # All allele related fields are looked up relative to a single SimpleAllele node
+    simple_allele = element.find("ClassifiedRecord/SimpleAllele")
+    if simple_allele is None:
+        simple_allele = ET.Element("SimpleAllele")
+    germline_classification = element.find(
+        "ClassifiedRecord/Classifications/GermlineClassification"
+    )
+
+    genes = [
+        inner.attrib.get("Symbol")
+        for inner in simple_allele.findall("GeneList/Gene")
+        if inner.attrib.get("Symbol") is not None
+    ]
+    proteins = [
+        inner.text
+        for inner in simple_allele.findall("ProteinChange")
+        if inner.text is not None
+    ]
+    conditions = [
+        inner.text
+        for inner in germline_classification.findall(
+            "ConditionList/TraitSet/Trait/Name/ElementValue[@Type='Preferred']"
+        )
+        if inner.text is not None
+    ]
+    xref = next(
+        (
+            inner for inner in simple_allele.iterfind("XRefList/XRef")
+            if inner.attrib.get("DB") == "dbSNP"
+        ),
+        None
+    )
+    molecular_consequences = {
+        inner.attrib.get("Type")
+        for inner in simple_allele.findall("HGVSlist/HGVS[@Type='coding']/MolecularConsequence")
+        if inner.attrib.get("Type") is not None
+    }
+
+    return [
+        # Name, Gene(s), Protein change, Condition(s) and Accession
+        _attribute(element, "VariationName"),
+        "|".join(genes),
+        ", ".join(proteins),
+        "|".join(conditions),
+        _attribute(element, "Accession"),
+        # GRCh37Chromosome, GRCh37Location, GRCh38Chromosome and GRCh38Location
+        *_clinvar_location_fields(simple_allele),
+        # VariationID, AlleleID(s) and dbSNP ID
+        _attribute(element, "VariationID"),
+        _attribute(simple_allele, "AlleleID"),
+        f"{xref.attrib.get('Type')}{xref.attrib.get('ID')}" if xref is not None else "",
+        # Canonical SPDI, Variant type and Molecular consequence
+        _text(simple_allele.find("CanonicalSPDI")),
+        _text(simple_allele.find("VariantType")),
+        "|".join(molecular_consequences),
+        # Germline classification, Germline review status and Germline date last evaluated
+        *_clinvar_classification_fields(germline_classification),
+    ]
+
+
+def parse_clinvar(rows: list[list[str]], variation_archives: Iterable[ET.Element]):
+    """
+    Converts ClinVar `VariationArchive` elements to rows of ClinVar CSV export columns.
+    :param rows: list the rows are appended to
+    :param variation_archives: `VariationArchive` elements, e.g. from `iter_variation_archives`
+    """
 
-def parse_clinvar(rows: list[list[str]], variation_archives: list[ET.Element]):
-    # Parse variation archives
     for element in variation_archives:
-        row = []
-
-        # Name
-        name = element.attrib.get("VariationName")
-        row.append(name if name is not None else "")
-
-        # Gene(s)
-        genes = [
-            inner.attrib.get("Symbol")
-            for inner in element.findall("ClassifiedRecord/SimpleAllele/GeneList/Gene")
-            if inner.attrib.get("Symbol") is not None
-        ]
-        row.append("|".join(genes) if genes else "")
-
-        # Protein change
-        proteins = [
-            inner.text
-            for inner in element.findall("ClassifiedRecord/SimpleAllele/ProteinChange")
-            if inner.text is not None
-        ]
-        row.append(", ".join(proteins) if proteins else "")
-
-        # Condition(s)
-        germline_classification = element.find("ClassifiedRecord/Classifications/GermlineClassification")
-        conditions = [
-            inner.text
-            for inner in germline_classification.findall("ConditionList/TraitSet/Trait/Name/ElementValue[@Type='Preferred']")
-            if inner.text is not None
-        ]
-        row.append("|".join(conditions) if conditions else "")
-
-        # Accession
-        accession = element.attrib.get("Accession")
-        row.append(accession if accession is not None else "")
-
-        # GRCh37Chromosome
-        grch37_sequence_location = element.find("ClassifiedRecord/SimpleAllele/Location/SequenceLocation[@Assembly='GRCh37']")
-        grch37_chromosome = grch37_sequence_location.attrib.get("Chr") if grch37_sequence_location is not None else None
-        row.append(grch37_chromosome if grch37_chromosome is not None else "")
-
-        # GRCh37Location
-        grch37_start = grch37_sequence_location.attrib.get("display_start") if grch37_sequence_location is not None else None
-        grch37_end = grch37_sequence_location.attrib.get("display_stop") if grch37_sequence_location is not None else None
-        row.append(f"{grch37_start} - {grch37_end}" if grch37_start is not None and grch37_end is not None and grch37_start != grch37_end else grch37_start if grch37_start is not None else "")
-
-        # GRCh38Chromosome
-        grch38_sequence_location = element.find("ClassifiedRecord/SimpleAllele/Location/SequenceLocation[@Assembly='GRCh38']")
-        grch38_chromosome = grch38_sequence_location.attrib.get("Chr") if grch38_sequence_location is not None else None
-        row.append(grch38_chromosome if grch38_chromosome is not None else "")
-
-        # GRCh38Location
-        grch38_start = grch38_sequence_location.attrib.get("display_start") if grch38_sequence_location is not None else None
-        grch38_end = grch38_sequence_location.attrib.get("display_stop") if grch38_sequence_location is not None else None
-        row.append(f"{grch38_start} - {grch38_end}" if grch38_start is not None and grch38_end is not None and grch38_start != grch38_end else grch38_start if grch38_start is not None else "")
-
-        # VariationID
-        variation_id = element.attrib.get("VariationID")
-        row.append(variation_id if variation_id is not None else "")
-
-        # AlleleID(s)
-        simple_allele = element.find("ClassifiedRecord/SimpleAllele")
-        allele_id = simple_allele.attrib.get("AlleleID") if simple_allele is not None else None
-        row.append(allele_id if allele_id is not None else "")
-
-        # dbSNP ID
-        xrefs = element.findall("ClassifiedRecord/SimpleAllele/XRefList/XRef")
-        xref = next((inner for inner in xrefs if inner.attrib.get("DB") == "dbSNP"), None)
-        row.append(f"{xref.attrib.get('Type')}{xref.attrib.get('ID')}" if xref is not None else "")
-
-        # Canonical SPDI
-        canonical_spdi = element.find("ClassifiedRecord/SimpleAllele/CanonicalSPDI")
-        row.append(canonical_spdi.text if canonical_spdi is not None else "")
-
-        # Variant type
-        variant_type = element.find("ClassifiedRecord/SimpleAllele/VariantType")
-        row.append(variant_type.text if variant_type is not None else "")
-
-        # Molecular consequence
-        molecular_consequences = [
-            inner.attrib.get("Type")
-            for inner in element.findall("ClassifiedRecord/SimpleAllele/HGVSlist/HGVS[@Type='coding']/MolecularConsequence")
-            if inner.attrib.get("Type") is not None
-        ]
-        molecular_consequences = list(set(molecular_consequences))
-        row.append("|".join(molecular_consequences) if molecular_consequences else "")
-
-        # Germline classification
-        description = germline_classification.find("Description") if germline_classification is not None else None
-        row.append(description.text if description is not None else "")
-
-        # Germline review status
-        review_status = germline_classification.find("ReviewStatus") if germline_classification is not None else None
-        row.append(review_status.text if review_status is not None else "")
-
-        # Germline date last evaluated
-        date_last_evaluated = germline_classification.attrib.get("DateLastEvaluated") if germline_classification is not None else None
-        row.append(datetime.strptime(date_last_evaluated, "%Y-%m-%d").strftime("%b %d, %Y") if date_last_evaluated is not None else "")
-
-        # Append row to rows
-        rows.append(row)
+        rows.append(_clinvar_row(element))
 
 
 def process_genomic_data(df: pd.DataFrame) -> pd.DataFrame:
@@ -685,7 +973,8 @@ def process_genomic_data(df: pd.DataFrame) -> pd.DataFrame:
             identifiers and annotation fields.
     Returns:
         final_df: DataFrame indexed by unique genomic position (gen_pos), with count columns for
-            each source (LOVD_count, gnomAD_count, ClinVar_count) and the specified annotation columns.
+            each source (LOVD_count, gnomAD_count, ClinVar_count) and the specified annotation
+            columns.
     """
     position_cols = {
         "hg38_gnomad_format": "LOVD_count",
@@ -702,34 +991,32 @@ def process_genomic_data(df: pd.DataFrame) -> pd.DataFrame:
         "Popmax_gnomad",
         "Popmax population_gnomad"
     ]
-    melted = df.melt(
-        id_vars=annotation_cols,
-        value_vars=list(position_cols.keys()),
-        var_name='source_col',
-        value_name='gen_pos'
-    )
-    melted = melted.dropna(subset=['gen_pos'])
     counts = (
-        melted
-        .groupby(['gen_pos', 'source_col'])
-        .size()
-        .unstack(fill_value=0)
-        .rename(columns=position_cols)
+        pd.concat(
+            {
+                count_col: df[position_col].value_counts()
+                for position_col, count_col in position_cols.items()
+            },
+            axis=1
+        )
+        .fillna(0)
+        .astype(int)
+        .sort_index()
     )
-    for count_col in position_cols.values():
-        if count_col not in counts:
-            counts[count_col] = 0
+    counts.index.name = 'gen_pos'
     annotations = (
-        melted
-        .sort_values('gen_pos')
-        .groupby('gen_pos')[annotation_cols]
+        pd.concat([
+            df[annotation_cols + [position_col]].rename(columns={position_col: 'gen_pos'})
+            for position_col in position_cols
+        ])
+        .dropna(subset=['gen_pos'])
+        .groupby('gen_pos', sort=False)[annotation_cols]
         .first()
     )
     final_df = (
         counts
         .join(annotations)
         .reset_index()
-        .rename(columns={'gen_pos': 'gen_pos'})
     )
     cols = ['gen_pos'] + annotation_cols + list(position_cols.values())
     final_df = final_df[cols]
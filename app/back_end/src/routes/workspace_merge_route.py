@@ -10,9 +10,15 @@ import os
 
 import pandas as pd
 from flask import Blueprint, request, jsonify
+from gevent.threadpool import ThreadPoolExecutor
 
 from ..setup.extensions import logger
-from ..utils.helpers import socketio_emit_to_user_session
+from ..utils.helpers import (
+    socketio_emit_to_user_session_in_background,
+    require_headers,
+    require_args,
+    str_to_bool,
+)
 from ..utils.exceptions import UnexpectedError
 from ..constants import (
     WORKSPACE_MERGE_ROUTE,
@@ -32,615 +38,360 @@ from ..data.refactoring import (
     merge_gnomad_lovd,
     merge_custom_file,
     merge_lovd_clinvar, transform_spdi_to_format,
-    process_genomic_data
+    process_genomic_data,
 )
 
 workspace_merge_route_bp = Blueprint("workspace_merge_route", __name__)
-@workspace_merge_route_bp.route(
-    f"{WORKSPACE_MERGE_ROUTE}/all/<path:relative_path>", methods=["GET"]
-)
-def get_workspace_merge_all(relative_path):
+
+# Columns of LOVD 'Variants_On_Genome' table used in merges
+LOVD_GENOME_COLUMNS = [
+    "id",
+    "VariantOnGenome/DNA",
+    "VariantOnGenome/DNA/hg38",
+    "VariantOnGenome/ClinicalClassification",
+    "VariantOnGenome/ClinicalClassification/Method",
+]
+
+
+def _read_merged(path: str) -> pd.DataFrame:
     """
-    Route to merge all data and save the merged data to the workspace.
+    Read previously merged data from the workspace.
+    Files with '.parquet' extension are read as Parquet, other files as CSV.
+
+    :param str path: path to the merged data file
+    :returns: existing merged data
+    :rtype: pd.DataFrame
     """
 
-    # Check if 'uuid' and 'sid' are provided in the headers
-    if "uuid" not in request.headers or "sid" not in request.headers:
-        return jsonify({"error": "UUID and SID headers are required"}), 400
-
-    uuid = request.headers.get("uuid")
-    sid = request.headers.get("sid")
-
-    # Check if 'override', 'lovdFile', 'clinvarFile' and 'gnomadFile' are provided
-    if (
-        "override" not in request.args
-        or "lovdFile" not in request.args
-        or "clinvarFile" not in request.args
-        or "gnomadFile" not in request.args
-    ):
-        return (
-            jsonify(
-                {
-                    "error": "'override', 'lovdFile', 'clinvarFile' and 'gnomadFile' parameters are required"
-                }
-            ),
-            400,
-        )
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, engine="pyarrow")
+    return pd.read_csv(path)
 
-    # Explanation about the parameters:
-    # - destination_path: string
-    #     - The path to the destination file (where to save it) in the user's workspace
-    #       Destination file can either be a new file or an existing file, check its existence
-    # - override: boolean
-    #     - If true, the existing destination file should be overridden
-    #     - If false, the existing destination file should not be overridden and merged
-    #       content should be appended
-    # - lovd_file: string
-    #     - The path to the LOVD file to be used in merge
-    # - clinvar_file: string
-    #     - The path to the ClinVar file to be used in merge
-    # - gnomad_file: string
-    #     - The path to the gnomAD file to be used in merge
-    # - custom_file: string
-    #     - The path to the custom file to be used in merge
-    #     - This is optional, if empty it should be ignored
 
-    destination_path = os.path.join(WORKSPACE_DIR, uuid, relative_path)
-    override = request.args.get(
-        "override", default=False, type=bool
-    )  # Ensure it's treated as a boolean
-    lovd_file = os.path.join(WORKSPACE_DIR, uuid, request.args.get("lovdFile"))
-    clinvar_file = os.path.join(WORKSPACE_DIR, uuid, request.args.get("clinvarFile"))
-    gnomad_file = os.path.join(WORKSPACE_DIR, uuid, request.args.get("gnomadFile"))
-    custom_file_param = request.args.get("customFile")
-    custom_file = os.path.join(WORKSPACE_DIR, uuid, custom_file_param) if custom_file_param else ""
+def _persist_merged(data: pd.DataFrame, path: str):
+    """
+    Save merged data to the workspace. If the file already exists, the data is appended to it.
+    Files with '.parquet' extension are saved as Parquet, other files as CSV.
 
-    try:
-        # Emit a feedback to the user's console
-        socketio_emit_to_user_session(
-            CONSOLE_FEEDBACK_EVENT,
-            {
-                "type": "info",
-                "message": f"Merging all data to '{relative_path}' with "
-                + f"override: '{override}'...",
-            },
-            uuid,
-            sid,
-        )
+    CSV files are written with pandas writer, so rows appended later are formatted the same way
+    as the existing ones. Rows are appended to the end of the file without rewriting it, when the
+    file has the same columns as the merged data. Otherwise the existing data is read in full,
+    combined and saved again, keeping columns from both the existing and the merged data.
 
-        if not os.path.exists(lovd_file):
-            raise FileNotFoundError(f"LOVD data file not found at: {lovd_file}")
+    :param DataFrame data: merged data to save
+    :param str path: path to the destination file
+    :raises RuntimeError: if the file can't be saved
+    """
 
-        if not os.path.exists(gnomad_file):
-            raise FileNotFoundError(f"gnomAD data file not found at: {gnomad_file}")
+    is_parquet = path.endswith(".parquet")
+    exists = os.path.exists(path) and os.path.getsize(path) > 0
 
-        if not os.path.exists(clinvar_file):
-            raise FileNotFoundError(f"Clinvar data file not found at: {clinvar_file}")
+    try:
+        if exists and not is_parquet:
+            header = pd.read_csv(path, nrows=0).columns.tolist()
+            if header == data.columns.tolist():
+                data.to_csv(path, mode="a", header=False, index=False)
+                return
+
+        if exists:
+            existing_data = _read_merged(path)
+            if not existing_data.empty:
+                data = pd.concat([existing_data, data], ignore_index=True)
+
+        if is_parquet:
+            data.to_parquet(path, engine="pyarrow", compression="snappy", index=False)
+        else:
+            data.to_csv(path, index=False)
+    except OSError as e:
+        raise RuntimeError(f"Error saving file: {e}") from e
 
-        existing_data = pd.DataFrame()
-        if os.path.exists(destination_path):
-            if override:
-                os.remove(destination_path)
-            else:
-                existing_data = pd.read_csv(destination_path)
 
-        lovd_data = parse_lovd(lovd_file)
-        gnomad_data = parse_gnomad(gnomad_file)
-        clinvar_data = clinvar_file_parse(clinvar_file)
+def _workspace_path(uuid: str, relative_path: str | None) -> str | None:
+    """
+    Build absolute path to a file in the user's workspace.
 
-        set_lovd_dtypes(lovd_data)
-        set_gnomad_dtypes(gnomad_data)
-        set_clinvar_dtypes(clinvar_data)
-
-        if custom_file_param:
-            custom_data = parse_custom_file(custom_file)
-            set_custom_file_dtypes(custom_data)
-
-        clinvar_data = transform_spdi_to_format(clinvar_data)
-
-        variants_on_genome = lovd_data["Variants_On_Genome"].copy()
-        lovd_data = pd.merge(
-            lovd_data["Variants_On_Transcripts"],
-            variants_on_genome[
-                ["id", "VariantOnGenome/DNA", "VariantOnGenome/DNA/hg38","VariantOnGenome/ClinicalClassification","VariantOnGenome/ClinicalClassification/Method"]
-            ],
-            on="id",
-            how="left",
-        )
-        lovd_clinvar_data= merge_lovd_clinvar(lovd_data, clinvar_data)
-        lovd_clinvar_gnomad_data = merge_gnomad_lovd(lovd_clinvar_data, gnomad_data)
-        if custom_file_param:
-            final_data = merge_custom_file(custom_data,lovd_clinvar_gnomad_data)
-        else:
-            final_data = lovd_clinvar_gnomad_data
+    :param str uuid: user's workspace identifier
+    :param str relative_path: path relative to the user's workspace, can be empty
+    :returns: absolute path or None if relative path is empty
+    :rtype: str | None
+    """
 
-        final_data = process_genomic_data(final_data).convert_dtypes()
-        # Append existing data if we're not overriding
-        if not existing_data.empty:
-            final_data = pd.concat([existing_data, final_data], ignore_index=True)
+    return os.path.join(WORKSPACE_DIR, uuid, relative_path) if relative_path else None
 
-        try:
-            final_data.to_csv(destination_path, index=False)
-        except OSError as e:
-            raise RuntimeError(f"Error saving file: {e}")
 
-        # Emit a feedback to the user's console
-        socketio_emit_to_user_session(
-            CONSOLE_FEEDBACK_EVENT,
-            {
-                "type": "succ",
-                "message": f"All data merge to '{relative_path}' was successful.",
-            },
-            uuid,
-            sid,
-        )
+def _ensure_in_workspace(uuid: str, *paths: str):
+    """
+    Check that paths don't point outside the user's workspace, e.g. using '..' or symbolic links.
 
-        socketio_emit_to_user_session(
-            WORKSPACE_UPDATE_FEEDBACK_EVENT,
-            {"status": "updated"},
-            uuid,
-            sid,
-        )
+    :param str uuid: user's workspace identifier
+    :param str paths: absolute paths, None paths are skipped
+    :raises PermissionError: if any path is outside the user's workspace
+    """
 
-    except FileNotFoundError as e:
-        logger.error(
-            "FileNotFoundError: %s while merging all data %s",
-            e,
-            destination_path,
-        )
-        # Emit a feedback to the user's console
-        socketio_emit_to_user_session(
-            CONSOLE_FEEDBACK_EVENT,
-            {
-                "type": "errr",
-                "message": f"FileNotFoundError: {e} while merging all data "
-                + f"{destination_path}",
-            },
-            uuid,
-            sid,
-        )
-        return jsonify({"error": "Requested file not found"}), 404
-    except PermissionError as e:
-        logger.error(
-            "PermissionError: %s while merging all data %s", e, destination_path
-        )
-        # Emit a feedback to the user's console
-        socketio_emit_to_user_session(
-            CONSOLE_FEEDBACK_EVENT,
-            {
-                "type": "errr",
-                "message": f"PermissionError: {e} while merging all data {destination_path}",
-            },
-            uuid,
-            sid,
-        )
-        return jsonify({"error": "Permission denied"}), 403
-    except UnexpectedError as e:
-        logger.error(
-            "UnexpectedError: %s while merging all data %s",
-            e.message,
-            destination_path,
-        )
-        # Emit a feedback to the user's console
-        socketio_emit_to_user_session(
-            CONSOLE_FEEDBACK_EVENT,
-            {
-                "type": "errr",
-                "message": f"UnexpectedError: {e.message} while mergingall data "
-                + f"{destination_path}",
-            },
-            uuid,
-            sid,
-        )
-        return jsonify({"error": "An internal error occurred"}), 500
-    except Exception as e:
-        logger.error(
-            "UnexpectedError: %s while merging all data %s",
-            e,
-            destination_path,
-        )
-        # Emit a feedback to the user's console
-        socketio_emit_to_user_session(
-            CONSOLE_FEEDBACK_EVENT,
-            {
-                "type": "errr",
-                "message": f"UnexpectedError: {e} while merging all data "
-                + f"{destination_path}",
-            },
-            uuid,
-            sid,
-        )
-        return jsonify({"error": "An internal error occurred"}), 500
+    workspace_root = os.path.realpath(WORKSPACE_DIR)
+    user_root = os.path.realpath(os.path.join(WORKSPACE_DIR, uuid))
+    if os.path.commonpath([workspace_root, user_root]) != workspace_root:
+        raise PermissionError(f"Workspace is outside of workspaces directory: {uuid}")
 
-    return jsonify({"message": "All data merge successful"}), 200
+    for path in paths:
+        if path and os.path.commonpath([user_root, os.path.realpath(path)]) != user_root:
+            raise PermissionError(f"Path is outside of the workspace: {path}")
 
 
-@workspace_merge_route_bp.route(
-    f"{WORKSPACE_MERGE_ROUTE}/lovd_gnomad/<path:relative_path>", methods=["GET"]
+# Error types handled by merge routes with error name shown to the user, response status and
+# response message, checked in order
+_ERROR_RESPONSES = (
+    (FileNotFoundError, "FileNotFoundError", 404, "Requested file not found"),
+    (PermissionError, "PermissionError", 403, "Permission denied"),
+    (Exception, "UnexpectedError", 500, "An internal error occurred"),
 )
-def get_workspace_merge_lovd_gnomad(relative_path):
+
+
+def _error_response(
+    error: Exception, description: str, destination_path: str, uuid, sid
+):
     """
-    Route to merge LOVD and gnomAD data and save the merged data to the workspace.
+    Log error raised while merging, emit it to the user's console and build the error response.
+
+    :param Exception error: raised error
+    :param str description: description of merged data, e.g. 'LOVD and gnomAD data'
+    :param str destination_path: path to the destination file
+    :param uuid: user's workspace identifier
+    :param sid: user's session identifier
+    :returns: Flask response with error status
     """
 
-    # Check if 'uuid' and 'sid' are provided in the headers
-    if "uuid" not in request.headers or "sid" not in request.headers:
-        return jsonify({"error": "UUID and SID headers are required"}), 400
-
-    uuid = request.headers.get("uuid")
-    sid = request.headers.get("sid")
-
-    # Check if 'override', 'lovdFile' and 'gnomadFile' are provided
-    if (
-        "override" not in request.args
-        or "lovdFile" not in request.args
-        or "gnomadFile" not in request.args
-    ):
-        return (
-            jsonify(
-                {
-                    "error": "'override', 'lovdFile' and 'gnomadFile' parameters are required"
-                }
-            ),
-            400,
-        )
+    error_name, status, response_message = next(
+        (name, status, message)
+        for error_type, name, status, message in _ERROR_RESPONSES
+        if isinstance(error, error_type)
+    )
+    if isinstance(error, UnexpectedError):
+        error = error.message
+
+    logger.error(
+        "%s: %s while merging %s %s", error_name, error, description, destination_path
+    )
+    # Emit a feedback to the user's console, after events emitted earlier by the merge
+    socketio_emit_to_user_session_in_background(
+        CONSOLE_FEEDBACK_EVENT,
+        {
+            "type": "errr",
+            "message": f"{error_name}: {error} while merging {description} "
+            + f"{destination_path}",
+        },
+        uuid,
+        sid,
+    )
+    return jsonify({"error": response_message}), status
+
+
+def _merge_pipeline(  # pylint: disable=too-many-arguments,too-many-locals
+    uuid,
+    sid,
+    relative_path: str,
+    description: str,
+    *,
+    lovd: str,
+    clinvar: str | None = None,
+    gnomad: str | None = None,
+    custom: str | None = None,
+    override=False,
+):
+    """
+    Merge LOVD data with given ClinVar, gnomAD and custom files and save result to the workspace.
+
+    Sources without paths are skipped, a given path must point to an existing file. When LOVD,
+    ClinVar and gnomAD data are all merged, the result is aggregated by genomic position.
+
+    :param uuid: user's workspace identifier
+    :param sid: user's session identifier
+    :param str relative_path: destination file path relative to the user's workspace
+    :param str description: description of merged data used in feedback, e.g. 'all data'
+    :param str lovd: path to the LOVD file
+    :param str clinvar: path to the ClinVar file
+    :param str gnomad: path to the gnomAD file
+    :param str custom: path to the custom file
+    :param override: if true, the existing destination file is overridden, otherwise merged data
+                     is appended to it
+    :returns: Flask response
+    """
 
-    # Explanation about the parameters:
-    # - destination_path: string
-    #     - The path to the destination file (where to save it) in the user's workspace
-    #       Destination file can either be a new file or an existing file, check its existence
-    # - override: boolean
-    #     - If true, the existing destination file should be overridden
-    #     - If false, the existing destination file should not be overridden and merged
-    #       content should be appended
-    # - lovd_file: string
-    #     - The path to the LOVD file to be used in merge
-    # - gnomad_file: string
-    #     - The path to the gnomAD file to be used in merge
-
-    destination_path = os.path.join(WORKSPACE_DIR, uuid, relative_path)
-    override = request.args.get(
-        "override", default=False, type=bool
-    )  # Ensure it's treated as a boolean
-    lovd_file = os.path.join(WORKSPACE_DIR, uuid, request.args.get("lovdFile"))
-    gnomad_file = os.path.join(WORKSPACE_DIR, uuid, request.args.get("gnomadFile"))
+    destination_path = _workspace_path(uuid, relative_path)
+    title = description[:1].upper() + description[1:]
 
     try:
         # Emit a feedback to the user's console
-        socketio_emit_to_user_session(
+        socketio_emit_to_user_session_in_background(
             CONSOLE_FEEDBACK_EVENT,
             {
                 "type": "info",
-                "message": f"Merging LOVD and gnomAD data to '{relative_path}' with "
+                "message": f"Merging {description} to '{relative_path}' with "
                 + f"override: '{override}'...",
             },
             uuid,
             sid,
         )
 
-        if not os.path.exists(lovd_file):
-            raise FileNotFoundError(f"LOVD data file not found at: {lovd_file}")
-
-        if not os.path.exists(gnomad_file):
-            raise FileNotFoundError(f"gnomAD data file not found at: {gnomad_file}")
-
-        # Load existing data if the destination file exists
-        existing_data = pd.DataFrame()
-        if os.path.exists(destination_path):
-            if override:
-                os.remove(destination_path)  # Remove file if overriding
-            else:
-                existing_data = pd.read_csv(destination_path)
-
-        lovd_data = parse_lovd(lovd_file)
-        gnomad_data = parse_gnomad(gnomad_file)
+        _ensure_in_workspace(uuid, destination_path, lovd, clinvar, gnomad, custom)
+
+        for name, path in (("LOVD", lovd), ("gnomAD", gnomad), ("ClinVar", clinvar)):
+            if path is not None and not os.path.isfile(path):
+                raise FileNotFoundError(f"{name} data file not found at: {path}")
+
+        # Remove existing destination file if overriding, otherwise merged data is appended to it
+        if override and os.path.exists(destination_path):
+            os.remove(destination_path)
+
+        # Source files are independent, parse them concurrently in native threads
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            # Only needed columns are parsed, so the tables aren't saved over the complete ones
+            lovd_future = executor.submit(
+                parse_lovd,
+                lovd,
+                save_to=None,
+                columns={"Variants_On_Genome": LOVD_GENOME_COLUMNS},
+            )
+            clinvar_future = (
+                executor.submit(clinvar_file_parse, clinvar) if clinvar is not None else None
+            )
+            gnomad_future = (
+                executor.submit(parse_gnomad, gnomad) if gnomad is not None else None
+            )
+            custom_future = (
+                executor.submit(parse_custom_file, custom) if custom is not None else None
+            )
+
+            lovd_data = lovd_future.result()
+            clinvar_data = clinvar_future.result() if clinvar_future else None
+            gnomad_data = gnomad_future.result() if gnomad_future else None
+            custom_data = custom_future.result() if custom_future else None
 
         set_lovd_dtypes(lovd_data)
-        set_gnomad_dtypes(gnomad_data)
 
-        variants_on_genome = lovd_data["Variants_On_Genome"].copy()
-
-        lovd_data = pd.merge(
-            lovd_data["Variants_On_Transcripts"],
-            variants_on_genome[
-                ["id", "VariantOnGenome/DNA", "VariantOnGenome/DNA/hg38","VariantOnGenome/ClinicalClassification","VariantOnGenome/ClinicalClassification/Method"]
-            ],
-            on="id",
-            how="left",
+        final_data = lovd_data["Variants_On_Transcripts"].join(
+            lovd_data["Variants_On_Genome"].set_index("id"), on="id", how="left"
         )
+        # Source frames with converted types aren't needed after merging, release them so they
+        # aren't kept in memory for the rest of the pipeline
+        del lovd_data
+
+        if clinvar_data is not None:
+            clinvar_data = set_clinvar_dtypes(clinvar_data)
+            clinvar_data = transform_spdi_to_format(clinvar_data)
+            final_data = merge_lovd_clinvar(final_data, clinvar_data)
+            del clinvar_data
 
-        final_data = merge_gnomad_lovd(lovd_data, gnomad_data)
+        if gnomad_data is not None:
+            gnomad_data = set_gnomad_dtypes(gnomad_data)
+            final_data = merge_gnomad_lovd(final_data, gnomad_data)
+            del gnomad_data
 
-        # Append existing data if we're not overriding
-        if not existing_data.empty:
-            final_data = pd.concat([existing_data, final_data], ignore_index=True)
+        if custom_data is not None:
+            custom_data = set_custom_file_dtypes(custom_data)
+            final_data = merge_custom_file(custom_data, final_data)
+            del custom_data
 
-        try:
-            final_data.to_csv(destination_path, index=False)
-        except OSError as e:
-            raise RuntimeError(f"Error saving file: {e}")
+        if clinvar is not None and gnomad is not None:
+            final_data = process_genomic_data(final_data)
+
+        _persist_merged(final_data, destination_path)
 
         # Emit a feedback to the user's console
-        socketio_emit_to_user_session(
+        socketio_emit_to_user_session_in_background(
             CONSOLE_FEEDBACK_EVENT,
             {
                 "type": "succ",
-                "message": f"LOVD and gnomAD merge to '{relative_path}' was successful.",
+                "message": f"{title} merge to '{relative_path}' was successful.",
             },
             uuid,
             sid,
         )
 
-        socketio_emit_to_user_session(
+        socketio_emit_to_user_session_in_background(
             WORKSPACE_UPDATE_FEEDBACK_EVENT,
             {"status": "updated"},
             uuid,
             sid,
         )
 
-    except FileNotFoundError as e:
-        logger.error(
-            "FileNotFoundError: %s while merging LOVD and gnomAD %s",
-            e,
-            destination_path,
-        )
-        # Emit a feedback to the user's console
-        socketio_emit_to_user_session(
-            CONSOLE_FEEDBACK_EVENT,
-            {
-                "type": "errr",
-                "message": f"FileNotFoundError: {e} while merging LOVD and gnomAD "
-                + f"{destination_path}",
-            },
-            uuid,
-            sid,
-        )
-        return jsonify({"error": "Requested file not found"}), 404
-    except PermissionError as e:
-        logger.error(
-            "PermissionError: %s while merging LOVD and gnomAD %s", e, destination_path
-        )
-        # Emit a feedback to the user's console
-        socketio_emit_to_user_session(
-            CONSOLE_FEEDBACK_EVENT,
-            {
-                "type": "errr",
-                "message": f"PermissionError: {e} while merging LOVD and gnomAD {destination_path}",
-            },
-            uuid,
-            sid,
-        )
-        return jsonify({"error": "Permission denied"}), 403
-    except UnexpectedError as e:
-        logger.error(
-            "UnexpectedError: %s while merging LOVD and gnomAD %s",
-            e.message,
-            destination_path,
-        )
-        # Emit a feedback to the user's console
-        socketio_emit_to_user_session(
-            CONSOLE_FEEDBACK_EVENT,
-            {
-                "type": "errr",
-                "message": f"UnexpectedError: {e.message} while merging LOVD and gnomAD "
-                + f"{destination_path}",
-            },
-            uuid,
-            sid,
-        )
-        return jsonify({"error": "An internal error occurred"}), 500
     except Exception as e:
-        logger.error(
-            "UnexpectedError: %s while merging LOVD and gnomAD %s",
-            e,
-            destination_path,
-        )
-        # Emit a feedback to the user's console
-        socketio_emit_to_user_session(
-            CONSOLE_FEEDBACK_EVENT,
-            {
-                "type": "errr",
-                "message": f"UnexpectedError: {e} while merging LOVD and gnomAD "
-                + f"{destination_path}",
-            },
-            uuid,
-            sid,
-        )
-        return jsonify({"error": "An internal error occurred"}), 500
+        return _error_response(e, description, destination_path, uuid, sid)
 
-    return jsonify({"message": "LOVD and gnomAD data merge successful"}), 200
+    return jsonify({"message": f"{title} merge successful"}), 200
 
 
 @workspace_merge_route_bp.route(
-    f"{WORKSPACE_MERGE_ROUTE}/lovd_clinvar/<path:relative_path>", methods=["GET"]
+    f"{WORKSPACE_MERGE_ROUTE}/all/<path:relative_path>", methods=["GET"]
 )
-def get_workspace_merge_lovd_clinvar(relative_path):
+@require_headers("uuid", "sid")
+@require_args("override", "lovdFile", "clinvarFile", "gnomadFile", allow_empty=("override",))
+def get_workspace_merge_all(relative_path, uuid, sid):
     """
-    Route to merge LOVD and ClinVar data and save the merged data to the workspace.
+    Route to merge all data and save the merged data to the workspace.
     """
 
-    # Check if 'uuid' and 'sid' are provided in the headers
-    if "uuid" not in request.headers or "sid" not in request.headers:
-        return jsonify({"error": "UUID and SID headers are required"}), 400
-
-    uuid = request.headers.get("uuid")
-    sid = request.headers.get("sid")
-
-    # Check if 'override', 'lovdFile' and 'gnomadFile' are provided
-    if (
-        "override" not in request.args
-        or "lovdFile" not in request.args
-        or "clinvarFile" not in request.args
-    ):
-        return (
-            jsonify(
-                {
-                    "error": "'override', 'lovdFile' and 'clinvarFile' parameters are required"
-                }
-            ),
-            400,
-        )
-
     # Explanation about the parameters:
-    # - destination_path: string
-    #     - The path to the destination file (where to save it) in the user's workspace
-    #       Destination file can either be a new file or an existing file, check its existence
     # - override: boolean
     #     - If true, the existing destination file should be overridden
     #     - If false, the existing destination file should not be overridden and merged
     #       content should be appended
-    # - lovd_file: string
-    #     - The path to the LOVD file to be used in merge
-    # - clinvar_file: string
-    #     - The path to the ClinVar file to be used in merge
-
-    destination_path = os.path.join(WORKSPACE_DIR, uuid, relative_path)
-    override = request.args.get("override")
-    lovd_file = os.path.join(WORKSPACE_DIR, uuid, request.args.get("lovdFile"))
-    clinvar_file = os.path.join(WORKSPACE_DIR, uuid, request.args.get("clinvarFile"))
-
-    try:
-        # Emit a feedback to the user's console
-        socketio_emit_to_user_session(
-            CONSOLE_FEEDBACK_EVENT,
-            {
-                "type": "info",
-                "message": f"Merging LOVD and ClinVar data to '{relative_path}' with "
-                + f"override: '{override}'...",
-            },
-            uuid,
-            sid,
-        )
-
-        if not os.path.exists(lovd_file):
-            raise FileNotFoundError(f"LOVD data file not found at: {lovd_file}")
-
-        if not os.path.exists(clinvar_file):
-            raise FileNotFoundError(f"ClinVar data file not found at: {clinvar_file}")
-
-        # Load existing data if the destination file exists
-        existing_data = pd.DataFrame()
-        if os.path.exists(destination_path):
-            if override:
-                os.remove(destination_path)  # Remove file if overriding
-            else:
-                existing_data = pd.read_csv(destination_path)
-
-        lovd_data = parse_lovd(lovd_file)
-        clinvar_data = clinvar_file_parse(clinvar_file)
-
-        set_lovd_dtypes(lovd_data)
-        set_clinvar_dtypes(clinvar_data)
-
-        variants_on_genome = lovd_data["Variants_On_Genome"].copy()
+    # - lovdFile, clinvarFile, gnomadFile: string
+    #     - The paths to the LOVD, ClinVar and gnomAD files to be used in merge
+    # - customFile: string
+    #     - The path to the custom file to be used in merge
+    #     - This is optional, if empty it should be ignored
 
-        lovd_data = pd.merge(
-            lovd_data["Variants_On_Transcripts"],
-            variants_on_genome[
-                ["id", "VariantOnGenome/DNA", "VariantOnGenome/DNA/hg38","VariantOnGenome/ClinicalClassification","VariantOnGenome/ClinicalClassification/Method"]
-            ],
-            on="id",
-            how="left",
-        )
-        clinvar_data = transform_spdi_to_format(clinvar_data)
-        final_data = merge_lovd_clinvar(lovd_data, clinvar_data)
+    return _merge_pipeline(
+        uuid,
+        sid,
+        relative_path,
+        "all data",
+        lovd=_workspace_path(uuid, request.args.get("lovdFile")),
+        clinvar=_workspace_path(uuid, request.args.get("clinvarFile")),
+        gnomad=_workspace_path(uuid, request.args.get("gnomadFile")),
+        custom=_workspace_path(uuid, request.args.get("customFile")),
+        override=str_to_bool(request.args["override"]),
+    )
 
-        # Append existing data if we're not overriding
-        if not existing_data.empty:
-            final_data = pd.concat([existing_data, final_data], ignore_index=True)
 
-        try:
-            final_data.to_csv(destination_path, index=False)
-        except OSError as e:
-            raise RuntimeError(f"Error saving file: {e}")
+@workspace_merge_route_bp.route(
+    f"{WORKSPACE_MERGE_ROUTE}/lovd_gnomad/<path:relative_path>", methods=["GET"]
+)
+@require_headers("uuid", "sid")
+@require_args("override", "lovdFile", "gnomadFile", allow_empty=("override",))
+def get_workspace_merge_lovd_gnomad(relative_path, uuid, sid):
+    """
+    Route to merge LOVD and gnomAD data and save the merged data to the workspace.
+    """
 
-        # Emit a feedback to the user's console
-        socketio_emit_to_user_session(
-            CONSOLE_FEEDBACK_EVENT,
-            {
-                "type": "succ",
-                "message": f"LOVD and ClinVar merge to '{relative_path}' was successful.",
-            },
-            uuid,
-            sid,
-        )
+    return _merge_pipeline(
+        uuid,
+        sid,
+        relative_path,
+        "LOVD and gnomAD data",
+        lovd=_workspace_path(uuid, request.args.get("lovdFile")),
+        gnomad=_workspace_path(uuid, request.args.get("gnomadFile")),
+        override=str_to_bool(request.args["override"]),
+    )
 
-        socketio_emit_to_user_session(
-            WORKSPACE_UPDATE_FEEDBACK_EVENT,
-            {"status": "updated"},
-            uuid,
-            sid,
-        )
 
-    except FileNotFoundError as e:
-        logger.error(
-            "FileNotFoundError: %s while merging LOVD and ClinVar %s",
-            e,
-            destination_path,
-        )
-        # Emit a feedback to the user's console
-        socketio_emit_to_user_session(
-            CONSOLE_FEEDBACK_EVENT,
-            {
-                "type": "errr",
-                "message": f"FileNotFoundError: {e} while merging LOVD and ClinVar "
-                + f"{destination_path}",
-            },
-            uuid,
-            sid,
-        )
-        return jsonify({"error": "Requested file not found"}), 404
-    except PermissionError as e:
-        logger.error(
-            "PermissionError: %s while merging LOVD and ClinVar %s", e, destination_path
-        )
-        # Emit a feedback to the user's console
-        socketio_emit_to_user_session(
-            CONSOLE_FEEDBACK_EVENT,
-            {
-                "type": "errr",
-                "message": f"PermissionError: {e} while merging LOVD and ClinVar "
-                + f"{destination_path}",
-            },
-            uuid,
-            sid,
-        )
-        return jsonify({"error": "Permission denied"}), 403
-    except UnexpectedError as e:
-        logger.error(
-            "UnexpectedError: %s while merging LOVD and ClinVar %s",
-            e.message,
-            destination_path,
-        )
-        # Emit a feedback to the user's console
-        socketio_emit_to_user_session(
-            CONSOLE_FEEDBACK_EVENT,
-            {
-                "type": "errr",
-                "message": f"UnexpectedError: {e.message} while merging LOVD and ClinVar "
-                + f"{destination_path}",
-            },
-            uuid,
-            sid,
-        )
-        return jsonify({"error": "An internal error occurred"}), 500
-    except Exception as e:
-        logger.error(
-            "UnexpectedError: %s while merging LOVD and ClinVar %s",
-            e,
-            destination_path,
-        )
-        # Emit a feedback to the user's console
-        socketio_emit_to_user_session(
-            CONSOLE_FEEDBACK_EVENT,
-            {
-                "type": "errr",
-                "message": f"UnexpectedError: {e} while merging LOVD and ClinVar "
-                + f"{destination_path}",
-            },
-            uuid,
-            sid,
-        )
-        return jsonify({"error": "An internal error occurred"}), 500
+@workspace_merge_route_bp.route(
+    f"{WORKSPACE_MERGE_ROUTE}/lovd_clinvar/<path:relative_path>", methods=["GET"]
+)
+@require_headers("uuid", "sid")
+@require_args("override", "lovdFile", "clinvarFile", allow_empty=("override",))
+def get_workspace_merge_lovd_clinvar(relative_path, uuid, sid):
+    """
+    Route to merge LOVD and ClinVar data and save the merged data to the workspace.
+    """
 
-    return jsonify({"message": "LOVD and ClinVar data merge successful"}), 200
+    return _merge_pipeline(
+        uuid,
+        sid,
+        relative_path,
+        "LOVD and ClinVar data",
+        lovd=_workspace_path(uuid, request.args.get("lovdFile")),
+        clinvar=_workspace_path(uuid, request.args.get("clinvarFile")),
+        override=str_to_bool(request.args["override"]),
+    )
@@ -1,14 +1,20 @@
 """ Module provides interface to web APIs of CADD tool. """
 import os
 import re
-import shutil
+import queue
+import threading
 import time
-import gzip
+from contextlib import contextmanager
 from datetime import datetime
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+from gevent import threadpool
+from isal import igzip
 from selenium import webdriver
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
@@ -16,6 +22,19 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.firefox.service import Service
 
+from .vcf import split_variants, VCF_WRITE_BUFFER_SIZE
+
+
+# Number of rows written to VCF file at once
+VCF_CHUNK_SIZE = 100_000
+# Columns of CADD output TSV file
+TSV_COLUMNS = ['Chrom', 'Pos', 'Ref', 'Alt', 'RawScore', 'PHRED']
+# Maximum number of browsers communicating with CADD web service at once
+SELENIUM_POOL_SIZE = 4
+# Maximum number of chunks being scored by CADD web service at once. Chunks waiting for CADD
+# results don't hold a browser, so while some chunks wait the others are uploaded and checked
+CADD_MAX_JOBS = 4 * SELENIUM_POOL_SIZE
+
 
 class CaddError(Exception):
     """Custom exception for CADD-related errors."""
@@ -23,11 +42,109 @@ class CaddError(Exception):
         super().__init__(f"CADD Error: {message}")
 
 
+def create_firefox_driver(download_dir: str | None = None) -> webdriver.Firefox:
+    """
+    Starts a headless Firefox web driver.
+
+    Args:
+        download_dir (str | None): Directory where downloaded gzip files are saved
+            without asking. If None, download preferences are not set.
+
+    Returns:
+        webdriver.Firefox: The started web driver.
+    """
+    options = webdriver.FirefoxOptions()
+    options.binary_location = "/usr/bin/firefox"
+    options.add_argument("--headless")
+    options.set_preference("browser.download.manager.showWhenStarting", False)
+    if download_dir is not None:
+        options.set_preference("browser.download.folderList", 2)
+        options.set_preference("browser.download.dir", download_dir)
+        options.set_preference("browser.helperApps.neverAsk.saveToDisk", "application/gzip")
+    service = Service(executable_path="/usr/local/bin/geckodriver")
+    return webdriver.Firefox(service=service, options=options)
+
+
+class SeleniumDriverPool:
+    """
+    Pool of headless Firefox web drivers reused between CADD requests.
+
+    Drivers are started when first needed, at most `size` of them, and are quit when
+    the pool is closed. Cookies are cleared whenever a driver is returned to the pool.
+    Use the pool as a context manager.
+
+    Args:
+        size (int): Maximum number of drivers.
+        download_dir (str | None): Directory where drivers save downloaded files.
+    """
+    def __init__(self, size: int, download_dir: str | None = None):
+        self._download_dir = download_dir
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.Queue()
+        self._drivers = []
+
+    @contextmanager
+    def driver(self):
+        """
+        Borrows a driver from the pool, waiting if all drivers are in use.
+
+        Yields:
+            webdriver.Firefox: The borrowed driver, returned to the pool afterwards.
+        """
+        self._slots.acquire()
+        try:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                driver = create_firefox_driver(self._download_dir)
+                self._drivers.append(driver)
+            try:
+                yield driver
+            finally:
+                self._release(driver)
+        finally:
+            self._slots.release()
+
+    def _release(self, driver: webdriver.Firefox):
+        """
+        Returns the driver to the pool. A driver which can't clear its cookies, e.g. because
+        the browser crashed, is quit and dropped, so the next user starts a new one.
+        """
+        try:
+            # Next user of the driver starts without the session of previous one
+            driver.delete_all_cookies()
+        except Exception:  # pylint: disable=broad-exception-caught
+            self._drivers.remove(driver)
+            _quit_driver(driver)
+        else:
+            self._idle.put(driver)
+
+    def close(self):
+        """Quits all drivers started by the pool."""
+        for driver in self._drivers:
+            _quit_driver(driver)
+        self._drivers.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _quit_driver(driver: webdriver.Firefox):
+    """Quits the driver, ignoring errors of a browser which is already dead."""
+    try:
+        driver.quit()
+    except Exception:  # pylint: disable=broad-exception-caught
+        pass
+
+
 def create_cadd_input_files(chunk: pd.DataFrame, cadd_folder_path: str, chunk_id: int):
     """
     Generates a VCF (Variant Call Format) file from a dataframe chunk for CADD processing.
 
-    This function takes a portion of genomic data (`chunk`), writes it to a VCF file
+    This function takes a portion of genomic data (`chunk`), writes it to a gzipped VCF file
     in the specified folder, and returns the file path along with the chunk ID.
 
     Args:
@@ -38,14 +155,20 @@ def create_cadd_input_files(chunk: pd.DataFrame, cadd_folder_path: str, chunk_id
     Returns:
         tuple: A tuple containing:
             - chunk_id (int): The identifier of the processed chunk.
-            - chunk_vcf_path (str): The full file path of the generated VCF file.
+            - chunk_vcf_path (str): The full file path of the generated gzipped VCF file.
+
+    Raises:
+        CaddError: If the file can't be written.
     """
-    chunk_vcf_path = os.path.join(cadd_folder_path,f"chunk_{chunk_id}.vcf")
-    write_vcf(dataframe=chunk, output_filepath=chunk_vcf_path)
+    chunk_vcf_path = os.path.join(cadd_folder_path,f"chunk_{chunk_id}.vcf.gz")
+    try:
+        write_vcf(dataframe=chunk, output_filepath=chunk_vcf_path, gzipped=True)
+    except OSError as e:
+        raise CaddError(f"Error during writing of file {chunk_vcf_path}: {str(e)}") from e
     return chunk_id, chunk_vcf_path
 
 
-def write_vcf(dataframe: pd.DataFrame, output_filepath: str) -> str:
+def write_vcf(dataframe: pd.DataFrame, output_filepath: str, gzipped: bool = False) -> str:
     """
     Writes a VCF (Variant Call Format) file without header
     from the given DataFrame, ensuring no duplicate variants.
@@ -53,59 +176,36 @@ def write_vcf(dataframe: pd.DataFrame, output_filepath: str) -> str:
     This function extracts specific variant information
     from a pandas DataFrame and writes it to a VCF file.
     It ensures that duplicate variants (same chromosome, position, ref, and alt)
-    are not written multiple times.
+    are not written multiple times. Rows are processed in chunks of
+    `VCF_CHUNK_SIZE` to bound memory usage on large DataFrames.
 
     Args:
         dataframe (pd.DataFrame): The DataFrame containing the variant data.
         output_filepath (str): The path where the VCF file will be saved.
+        gzipped (bool): If True, the file is compressed with gzip while writing.
 
     Returns:
         str: The file path where the VCF file has been written.
     """
-    seen_variants = set()
-    with open(output_filepath, 'w', encoding='utf-8') as f:
-        variant_columns = ["gen_pos"]
-        for row in dataframe.itertuples(index=False):
-            variant_value = next(
-            (getattr(row,col) for col in variant_columns
-            if hasattr(row,col) and pd.notna(getattr(row,col))
-            and getattr(row,col) != "?"), None
-            )
-            if variant_value:
-                parsed_variant = parse_variant(variant_value)
-                if parsed_variant:
-                    chrom, pos, ref, alt = parsed_variant
-                    if (chrom, pos, ref, alt) not in seen_variants:
-                        seen_variants.add((chrom, pos, ref, alt))
-                        f.write(f"{chrom}\t{pos}\t.\t{ref}\t{alt}\t.\t.\t.\n")
+    seen_variants = np.empty(0, dtype=np.uint64)
+    if gzipped:
+        # Fastest compression level, the file is only uploaded to CADD
+        f = igzip.open(output_filepath, 'wt', compresslevel=1, encoding='utf-8')
+    else:
+        f = open(output_filepath, 'w', buffering=VCF_WRITE_BUFFER_SIZE, encoding='utf-8')
+    with f:
+        for start in range(0, len(dataframe), VCF_CHUNK_SIZE):
+            variants = split_variants(dataframe.iloc[start:start + VCF_CHUNK_SIZE])
+            # Variants are compared by 64-bit hashes, so only hashes are kept across chunks
+            hashes = pd.util.hash_pandas_object(variants, index=False).to_numpy()
+            unique = ~pd.Series(hashes).duplicated().to_numpy() & ~np.isin(hashes, seen_variants)
+            seen_variants = np.concatenate((seen_variants, hashes[unique]))
+            variants[unique].to_csv(f, sep='\t', header=False, index=False, lineterminator='\n')
     return output_filepath
 
 
-def gzip_file(file_path: str):
-    """
-    Compresses a file into a .gz format.
-
-    This function takes a file at the given file path and compresses it
-    into a .gz file by reading the original file and writing it to a
-    gzipped version.
-
-    Args:
-        file_path (str): The path of the file to be compressed.
-
-    Returns:
-        str: The path to the newly gzipped file.
-    """
-    gzipped_file_path = f"{file_path}.gz"
-    try:
-        with open(file_path, 'rb') as f_in:
-            with gzip.open(gzipped_file_path, 'wb') as f_out:
-                shutil.copyfileobj(f_in, f_out)
-        return gzipped_file_path
-    except Exception as e:
-        raise CaddError(f"Error during compression of file {file_path}: {str(e)}") from e
-
-
-def send_cadd_input_files(gzipped_chunk_path:str,chunk_id:int):
+def send_cadd_input_files(gzipped_chunk_path:str,chunk_id:int,
+                          driver: webdriver.Firefox | None = None):
     """
     Uploads a gzipped genomic data chunk to the CADD web service and retrieves the job URL.
 
@@ -117,6 +217,8 @@ def send_cadd_input_files(gzipped_chunk_path:str,chunk_id:int):
     Args:
         gzipped_chunk_path (str): The file path of the gzipped input data chunk to be uploaded.
         chunk_id (int): The identifier for the data chunk, used to track the submission.
+        driver (webdriver.Firefox | None): The web driver to use, e.g. from `SeleniumDriverPool`.
+            If None, a new driver is started and quit afterwards.
 
     Returns:
         tuple: A tuple containing:
@@ -126,12 +228,13 @@ def send_cadd_input_files(gzipped_chunk_path:str,chunk_id:int):
     Raises:
         TimeoutException: If the status or availability link is not found within the given time.
     """
-    options = webdriver.FirefoxOptions()
-    options.binary_location = "/usr/bin/firefox"
-    options.add_argument("--headless")
-    options.set_preference("browser.download.manager.showWhenStarting", False)
-    service = Service(executable_path="/usr/local/bin/geckodriver")
-    driver = webdriver.Firefox(service=service, options=options)
+    if driver is None:
+        driver = create_firefox_driver()
+        try:
+            return send_cadd_input_files(gzipped_chunk_path, chunk_id, driver)
+        finally:
+            driver.quit()
+
     driver.get("https://cadd.bihealth.org/score")
 
     file_input = WebDriverWait(driver, 20).until(
@@ -157,7 +260,6 @@ def send_cadd_input_files(gzipped_chunk_path:str,chunk_id:int):
         except TimeoutException as exc:
             raise CaddError(
             f"Could not find the job status link (/check_avail/).Error:{str(exc)}") from exc
-    driver.quit()
 
     return chunk_id, f"https://cadd.bihealth.org/check_avail/{job_file}"
 
@@ -190,132 +292,118 @@ def extract_job_file(url:str):
     raise CaddError("CADD server: Invalid URL format - filename not found.")
 
 
-def get_cadd_output_files(cadd_job_url: str, cadd_output_dir: str, chunk_id: int,max_retries=15):
-    """Downloads CADD output file while preventing infinite loops.
+def click_finished_link(driver: webdriver.Firefox, cadd_job_url: str) -> str | None:
+    """
+    Opens the CADD job page and starts download of the output file if the job is finished.
 
     Args:
+        driver (webdriver.Firefox): The web driver to use.
         cadd_job_url (str): The URL of the CADD job.
-        cadd_output_dir (str): The directory to save the output file.
-        chunk_id (int): The chunk identifier.
-        max_retries (int): Maximum number of retries before giving up.
-        retry_interval (int): Time (in seconds) between retries.
 
     Returns:
-        tuple: (chunk_id, job_id) if successful, else raises TimeoutException.
+        str | None: The name of the downloaded file, or None if the job isn't finished yet.
     """
-    options = webdriver.FirefoxOptions()
-    options.binary_location = "/usr/bin/firefox"
-    options.add_argument("--headless")
-    options.set_preference("browser.download.folderList", 2)
-    options.set_preference("browser.download.manager.showWhenStarting", False)
-    options.set_preference("browser.download.dir", cadd_output_dir)
-    options.set_preference("browser.helperApps.neverAsk.saveToDisk", "application/gzip")
-    service = Service(executable_path="/usr/local/bin/geckodriver")
-    driver = webdriver.Firefox(service=service, options=options)
-    retry_count = 0
-
     driver.get(cadd_job_url)
     try:
         finished_link = WebDriverWait(driver, 3).until(
             EC.presence_of_element_located(
             (By.XPATH, '//a[contains(@href, "/static/finished/")]')))
-        job_file = extract_job_file(finished_link.get_attribute("href"))
-        finished_link.click()
     except TimeoutException:
-        for retry_count in range(max_retries):
-            driver.refresh()
-            try:
-                finished_link = WebDriverWait(driver, 3).until(
-                    EC.presence_of_element_located(
-                        (By.XPATH, '//a[contains(@href, "/static/finished/")]'))
-                )
-                job_file = extract_job_file(finished_link.get_attribute("href"))
-                finished_link.click()
-                break
-            except TimeoutException as e:
-                if retry_count == max_retries - 1:
-                    error_message = (
-                        f"Max retries reached: Unable to fetch CADD output from {cadd_job_url} "
-                        f"after {max_retries} attempts."
-                    )
-                    raise CaddError(error_message) from e
-                time.sleep(120)
-    driver.quit()
-    return chunk_id, job_file
-
-
-def gunzip_file(file_path: str, chunk_id: int):
-    """
-    Uncompresses a .gz file to its uncompressed version.
+        return None
+    job_file = extract_job_file(finished_link.get_attribute("href"))
+    finished_link.click()
+    return job_file
+
 
-    This function takes a gzipped file at the given file path and uncompresses it
-    by reading the .gz file and extracting it to an uncompressed version.
+def get_cadd_output_files(cadd_job_url: str, cadd_output_dir: str, chunk_id: int,max_retries=15,
+                          pool: SeleniumDriverPool | None = None):
+    """Downloads CADD output file while preventing infinite loops.
+
+    A driver is borrowed from the pool only to check the job page and download the file,
+    it's returned to the pool while waiting between retries.
 
     Args:
-        file_path (str): The path of the gzipped file to be uncompressed.
-        chunk_id (int): The chunk identifier associated with the file.
+        cadd_job_url (str): The URL of the CADD job.
+        cadd_output_dir (str): The directory to save the output file.
+        chunk_id (int): The chunk identifier.
+        max_retries (int): Maximum number of retries before giving up.
+        pool (SeleniumDriverPool | None): The pool to borrow drivers from, its drivers must
+            save downloads to `cadd_output_dir`. If None, a new driver is started and quit
+            afterwards.
 
     Returns:
-        tuple: A tuple containing the chunk_id and the path to the uncompressed file.
+        tuple: (chunk_id, job_id) if successful, else raises CaddError.
+    """
+    if pool is None:
+        with SeleniumDriverPool(1, cadd_output_dir) as own_pool:
+            return get_cadd_output_files(cadd_job_url, cadd_output_dir, chunk_id, max_retries,
+                                         own_pool)
+
+    for retry_count in range(max_retries + 1):
+        with pool.driver() as driver:
+            job_file = click_finished_link(driver, cadd_job_url)
+            if job_file is not None:
+                # The driver is kept until the download is saved
+                wait_for_download(os.path.join(cadd_output_dir, job_file))
+                return chunk_id, job_file
+        if retry_count == max_retries:
+            break
+        # First retry follows right away, like a page refresh
+        if retry_count > 0:
+            time.sleep(120)
+    raise CaddError(
+        f"Max retries reached: Unable to fetch CADD output from {cadd_job_url} "
+        f"after {max_retries} attempts."
+    )
 
-    Raises:
-        CaddError: If an error occurs during the decompression process.
+
+def wait_for_download(file_path: str, timeout: float = 300):
     """
-    uncompressed_file_path = file_path[:-3]
-    try:
-        with gzip.open(file_path, 'rb') as f_in:
-            with open(uncompressed_file_path, 'wb') as f_out:
-                shutil.copyfileobj(f_in, f_out)
-        return chunk_id, uncompressed_file_path
-    except Exception as e:
-        raise CaddError(f"Error during decompression of file {file_path}: {str(e)}") from e
+    Waits until the browser finishes downloading a file.
 
+    Firefox saves the download to a '.part' file next to the target path and renames it
+    when the download is complete.
 
-def parse_variant(variant_str:str):
+    Args:
+        file_path (str): Path of the downloaded file.
+        timeout (float): Maximum time (in seconds) to wait.
+
+    Raises:
+        CaddError: If the download doesn't finish in time.
     """
-    Parses a variant string and extracts chromosome, position, reference, and alternative alleles.
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(file_path) or os.path.exists(f"{file_path}.part"):
+        if time.monotonic() > deadline:
+            raise CaddError(f"Download of {file_path} didn't finish in {timeout} seconds.")
+        time.sleep(0.5)
+
 
-    The function takes a variant string in the format of `chrom-pos-ref-alt` (e.g., `1-123-A-G`),
-    and splits it into the individual components.
-    If the string contains only chromosome and position
-    (e.g., `1-123`), it will assume reference and
-    alternative alleles as missing (represented by `"."`).
+def open_tsv(file_path: str):
+    """
+    Opens a TSV file for binary reading, decompressing gzipped files ending with '.gz'.
 
     Args:
-        variant_str (str): The variant string to be parsed,
-        typically in the format `chrom-pos-ref-alt`.
+        file_path (str): Path to the TSV file.
 
     Returns:
-        tuple: A tuple containing:
-            - chrom (str): The chromosome part of the variant string.
-            - pos (str): The position part of the variant string.
-            - ref (str): The reference allele (or `"."` if not provided).
-            - alt (str): The alternative allele (or `"."` if not provided).
-
-    Example:
-        parse_variant("1-123-A-G")  -> ('1', '123', 'A', 'G')
+        A binary file object.
     """
-    try:
-        if not isinstance(variant_str, str):
-            return None
-        chrom, pos, ref, alt = variant_str.split("-")
-        if not chrom or not pos or not ref or not alt:
-            return None
-        return chrom, pos, ref, alt
-    except (ValueError, AttributeError):
-        return None
+    if file_path.endswith('.gz'):
+        return igzip.open(file_path, 'rb')
+    return open(file_path, 'rb')
 
 
 def parse_tsv(file_path:str)->pd.DataFrame:
     """
     Parses a TSV file and returns a DataFrame with two columns: 'cadd_gen_position' and 'PHRED'.
 
-    The function reads the TSV file, skipping comment lines, and generates a new column,
+    The function reads the TSV file, decompressing it on the fly if it is gzipped,
+    skipping comment lines, and generates a new column,
     'cadd_gen_position', by concatenating 'Chrom', 'Pos', 'Ref', and 'Alt'. It also extracts
     the 'PHRED' scores.
 
     Args:
-        file_path (str): Path to the TSV file.
+        file_path (str): Path to the TSV file or gzipped TSV file ending with '.gz'.
 
     Returns:
         pd.DataFrame: DataFrame with 'cadd_gen_position' and 'PHRED' columns.
@@ -323,14 +411,30 @@ def parse_tsv(file_path:str)->pd.DataFrame:
     Example:
         result = parse_tsv('file_path.tsv')
     """
-    df = pd.read_csv(file_path, sep='\t', comment='#',
-                    names=['Chrom', 'Pos', 'Ref', 'Alt', 'RawScore', 'PHRED'])
-    df['cadd_gen_position'] = (
-    df['Chrom'].astype(str) + '-' +
-    df['Pos'].astype(str) + '-' +
-    df['Ref'] + '-' +
-    df['Alt'])
-    return df[['cadd_gen_position', 'PHRED']]
+    # Comment lines are only at the beginning of CADD output and pyarrow can't skip them itself
+    skip_rows = 0
+    with open_tsv(file_path) as f:
+        for line in f:
+            if not line.startswith(b'#'):
+                break
+            skip_rows += 1
+
+    with open_tsv(file_path) as f:
+        table = pa_csv.read_csv(
+            f,
+            read_options=pa_csv.ReadOptions(
+                skip_rows=skip_rows, column_names=TSV_COLUMNS, block_size=16 << 20),
+            parse_options=pa_csv.ParseOptions(delimiter='\t'),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=['Chrom', 'Pos', 'Ref', 'Alt', 'PHRED'],
+                column_types={
+                    'Chrom': pa.string(), 'Pos': pa.string(), 'Ref': pa.string(),
+                    'Alt': pa.string(), 'PHRED': pa.float64(),
+                }),
+        )
+    positions = pc.binary_join_element_wise(  # pylint: disable=no-member
+        table['Chrom'], table['Pos'], table['Ref'], table['Alt'], '-')
+    return pa.table({'cadd_gen_position': positions, 'PHRED': table['PHRED']}).to_pandas()
 
 
 def merge_with_tsv(data_chunk:pd.DataFrame, tsv_chunk):
@@ -349,18 +453,107 @@ def merge_with_tsv(data_chunk:pd.DataFrame, tsv_chunk):
         tsv_chunk (pd.DataFrame): The DataFrame containing CADD genomic positions.
 
     Returns:
-        pd.DataFrame: The merged DataFrame based on the matching positions.
+        pd.DataFrame: The data_chunk with added 'PHRED' column, rows and their order
+        are kept. If the position is listed multiple times, the first score is used.
     """
 
-    merged_df = pd.merge(
-        data_chunk,
-        tsv_chunk[['cadd_gen_position', 'PHRED']],
-        left_on='gen_pos',
-        right_on='cadd_gen_position',
-        how='left'
-    )
+    phred = tsv_chunk.drop_duplicates('cadd_gen_position').set_index('cadd_gen_position')['PHRED']
+    return data_chunk.assign(PHRED=data_chunk['gen_pos'].map(phred))
+
+
+def run_with_pooled_driver(pool: SeleniumDriverPool, function, *args):
+    """
+    Calls a CADD web service function with a driver borrowed from the pool.
+
+    Args:
+        pool (SeleniumDriverPool): The pool to borrow the driver from.
+        function (Callable): Function accepting the driver as `driver` keyword argument.
+        *args: Positional arguments of the function.
+
+    Returns:
+        The result of the function.
+    """
+    with pool.driver() as driver:
+        return function(*args, driver=driver)
+
+
+def score_with_cadd(pool: SeleniumDriverPool, vcf_chunk_path: str, cadd_output_dir: str,
+                    chunk_id: int):
+    """
+    Uploads a gzipped VCF chunk to CADD web service and downloads its scores.
+
+    The uploaded file is removed and the downloaded file is renamed to
+    `cadd_chunk_{chunk_id}.tsv.gz`. Drivers are borrowed from the pool only for the upload and
+    for each check of the job, so other chunks can use them while CADD scores this one.
+
+    Args:
+        pool (SeleniumDriverPool): The pool saving downloads to `cadd_output_dir`.
+        vcf_chunk_path (str): The file path of the gzipped VCF chunk.
+        cadd_output_dir (str): The directory to save the output file.
+        chunk_id (int): The chunk identifier.
+
+    Returns:
+        tuple: A tuple containing the chunk_id and the path to the gzipped CADD output file.
+    """
+    _, cadd_job_url = run_with_pooled_driver(
+        pool, send_cadd_input_files, vcf_chunk_path, chunk_id)
+    os.remove(vcf_chunk_path)
+
+    _, cadd_gzip_file_path = get_cadd_output_files(
+        cadd_job_url, cadd_output_dir, chunk_id, pool=pool)
+    renamed_path = os.path.join(cadd_output_dir,f"cadd_chunk_{chunk_id}.tsv.gz")
+    os.rename(os.path.join(cadd_output_dir,cadd_gzip_file_path), renamed_path)
+    return chunk_id, renamed_path
+
+
+def score_chunks_with_cadd(data_chunks: list[pd.DataFrame], cadd_folder_input: str,
+                           cadd_folder_output: str) -> list[pd.DataFrame]:
+    """
+    Scores chunks of genomic data with CADD web service concurrently.
 
-    return merged_df.drop(columns=['cadd_gen_position'])
+    Args:
+        data_chunks (list[pd.DataFrame]): Chunks of the input genomic data.
+        cadd_folder_input (str): Directory for VCF files uploaded to CADD.
+        cadd_folder_output (str): Directory for CADD output files.
+
+    Returns:
+        list[pd.DataFrame]: Chunks merged with CADD scores, in the order of given chunks.
+    """
+    num_chunks = len(data_chunks)
+
+    # Stages overlap: a chunk is uploaded as soon as it's written, while CADD scores it the
+    # following chunks are uploaded, and its output is parsed as soon as it's downloaded.
+    # Writing and parsing need native threads, web jobs only wait for I/O, so the stdlib
+    # executor's workers, greenlets under gevent's patch_all, are enough for them
+    with threadpool.ThreadPoolExecutor(max_workers=min(num_chunks, os.cpu_count() or 1)) as \
+            native_executor, \
+            SeleniumDriverPool(SELENIUM_POOL_SIZE, cadd_folder_output) as pool, \
+            ThreadPoolExecutor(max_workers=min(num_chunks, CADD_MAX_JOBS)) as web_executor:
+        # Chunks are written and parsed in native threads, so they aren't pickled to processes.
+        # Writers only get the 'gen_pos' column they read, other columns stay with the merge
+        write_jobs = [native_executor.submit(
+            create_cadd_input_files,
+            data_chunks[i][["gen_pos"]],
+            cadd_folder_input,
+            i) for i in range(num_chunks)]
+
+        web_jobs = []
+        for job in write_jobs:
+            chunk_id, vcf_chunk_path = job.result()
+            web_jobs.append(web_executor.submit(
+                score_with_cadd,
+                pool,
+                vcf_chunk_path,
+                cadd_folder_output,
+                chunk_id))
+
+        parse_jobs = {}
+        for job in as_completed(web_jobs):
+            chunk_id, tsv_chunk_path = job.result()
+            parse_jobs[chunk_id] = native_executor.submit(parse_tsv, tsv_chunk_path)
+
+        return [merge_with_tsv(data_chunks[chunk_id], parse_jobs[chunk_id].result())
+                for chunk_id in range(num_chunks)]
 
 
 def cadd_pipeline(dataframe: pd.DataFrame, cadd_folder_path: str) -> pd.DataFrame:
@@ -374,61 +567,31 @@ def cadd_pipeline(dataframe: pd.DataFrame, cadd_folder_path: str) -> pd.DataFram
 
     Returns:
         pd.DataFrame: The final merged dataframe with CADD scores.
+
+    Raises:
+        ValueError: If the dataframe has no 'gen_pos' column.
     """
-    num_chunks = max(2, len(dataframe) // 1000)
-    data_chunks = np.array_split(dataframe, num_chunks)
-    vcf_gziped_chunks={}
-    cadd_job_chunks={}
-    tsv_chunks={}
-    merged_chunks={}
+    if 'gen_pos' not in dataframe.columns:
+        raise ValueError("CADD input data must have 'gen_pos' column")
+
+    num_chunks = max(1, (len(dataframe) + 999) // 1000)
 
     cadd_folder_path = os.path.join(cadd_folder_path,
                                     datetime.now().strftime("%Y%m%d_%H%M%S"))
     cadd_folder_input = os.path.join(cadd_folder_path,"input")
     cadd_folder_output = os.path.join(cadd_folder_path,"output")
-    if not os.path.exists(cadd_folder_input):
-        os.makedirs(cadd_folder_input)
-    if not os.path.exists(cadd_folder_output):
-        os.makedirs(cadd_folder_output)
-
-    with ProcessPoolExecutor() as executor:
-        jobs = {executor.submit(
-            create_cadd_input_files,
-            data_chunks[i],
-            cadd_folder_input,
-            i): i for i in range(num_chunks)}
-        for job in jobs:
-            chunk_id, vcf_chunk_path = job.result()
-            vcf_gziped_chunks[chunk_id] = gzip_file(vcf_chunk_path)
-            os.remove(os.path.join(cadd_folder_input,vcf_chunk_path))
-
-    for i in range(num_chunks):
-        chunk_id, cadd_job_url = send_cadd_input_files(
-            vcf_gziped_chunks[i],
-            i)
-        os.remove(os.path.join(cadd_folder_input,vcf_gziped_chunks[chunk_id]))
-        cadd_job_chunks[chunk_id] = cadd_job_url
-
-    for i in range(num_chunks):
-        chunk_id, cadd_gzip_file_path = get_cadd_output_files(
-            cadd_job_chunks[i],
-            cadd_folder_output,
-            i)
-        renamed_path = os.path.join(cadd_folder_output,f"cadd_chunk_{chunk_id}.tsv.gz")
-        os.rename(os.path.join(cadd_folder_output,cadd_gzip_file_path),
-                  renamed_path)
-        tsv_chunks[chunk_id] = renamed_path
-
-    with ProcessPoolExecutor() as executor:
-        jobs = {executor.submit(
-            gunzip_file,
-            os.path.join(cadd_folder_output,
-            tsv_chunks[i]),
-            i): i for i in range(num_chunks)}
-        for job in jobs:
-            chunk_id, cadd_tsv_file_path = job.result()
-            merged_chunks[chunk_id] = merge_with_tsv(
-                data_chunks[chunk_id],
-                parse_tsv(cadd_tsv_file_path))
-            os.remove(os.path.join(cadd_folder_output,cadd_tsv_file_path))
-    return pd.concat(merged_chunks.values(), ignore_index=True)
+    os.makedirs(cadd_folder_input, exist_ok=True)
+    os.makedirs(cadd_folder_output, exist_ok=True)
+
+    if num_chunks == 1:
+        # Small inputs are scored as one chunk with one browser, without starting thread pools
+        chunk_id, vcf_chunk_path = create_cadd_input_files(
+            dataframe[["gen_pos"]], cadd_folder_input, 0)
+        with SeleniumDriverPool(1, cadd_folder_output) as pool:
+            chunk_id, tsv_chunk_path = score_with_cadd(
+                pool, vcf_chunk_path, cadd_folder_output, chunk_id)
+        return merge_with_tsv(dataframe, parse_tsv(tsv_chunk_path)).reset_index(drop=True)
+
+    merged_chunks = score_chunks_with_cadd(
+        np.array_split(dataframe, num_chunks), cadd_folder_input, cadd_folder_output)
+    return pd.concat(merged_chunks, ignore_index=True)
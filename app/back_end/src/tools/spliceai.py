@@ -7,63 +7,56 @@ predicted splicing effects into a Pandas DataFrame.
 
 Main Features:
 --------------
-- **Variant Parsing:** Extracts chromosome, position, reference, and alternative alleles from variant identifiers.
-- **VCF File Handling:** Writes a VCF file from a DataFrame and parses SpliceAI-annotated VCF output.
+- **VCF File Handling:** Writes a VCF file from a DataFrame and parses SpliceAI-annotated VCF
+  output.
 - **SpliceAI Execution:** Runs SpliceAI to predict splicing effects and extracts relevant scores.
 - **Data Integration:** Merges SpliceAI predictions into the input DataFrame.
 
 Functions:
 ----------
-- `parse_variant(variant_str)`: Parses a variant string to extract genomic coordinates and alleles.
-- `write_vcf(dataframe, output_filename)`: Generates a VCF file from a DataFrame containing variant information.
+- `write_vcf(dataframe, output_filename)`: Generates a VCF file from a DataFrame containing
+  variant information.
 - `run_spliceai(input_vcf, output_vcf, fasta, annotation)`: Executes SpliceAI on the input VCF file.
-- `parse_spliceai_vcf(vcf_file)`: Parses a SpliceAI-annotated VCF file to extract delta scores and positions.
+- `parse_spliceai_vcf(vcf_file)`: Parses a SpliceAI-annotated VCF file to extract delta scores
+  and positions.
 - `get_variant_value(row)`: Retrieves a variant identifier from a DataFrame row.
-- `merge_spliceai_scores(data, spliceai_scores)`: Merges SpliceAI scores into a DataFrame based on variant values.
-- `add_spliceai_eval_columns(data, fasta_path, spliceai_dir)`: Adds SpliceAI evaluation columns to a DataFrame.
+- `merge_spliceai_scores(data, spliceai_scores)`: Merges SpliceAI scores into a DataFrame based
+  on variant values.
+- `add_spliceai_eval_columns(data, fasta_path, spliceai_dir)`: Adds SpliceAI evaluation columns
+  to a DataFrame.
 
 Exceptions:
 -----------
 - `SpliceAIError`: Custom exception class for errors related to SpliceAI execution and processing.
 """
 import os
+import re
 import subprocess
-import pandas as pd
 from datetime import datetime
 
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 
+from .vcf import split_variants, VCF_WRITE_BUFFER_SIZE
 
-class SpliceAIError(Exception):
-    """Custom exception for SpliceAI errors."""
-
-
-def parse_variant(variant_str):
-    """
-    Parses a variant string to extract chromosome, position, reference, and alternative alleles.
-
-    This function processes a variant string in the format `chrom-pos-ref-alt` (e.g., `1-123-A-G`),
-    splitting it into its respective components. If parsing fails, the function returns `None`.
 
-    Args:
-        variant_str (str): A string representing a genomic variant in the format `chrom-pos-ref-alt`.
-    Returns:
-        tuple: A tuple containing:
-            - chrom (str): The chromosome part of the variant string.
-            - pos (str): The position part of the variant string.
-            - ref (str): The reference allele.
-            - alt (str): The alternative allele.
-            - `None` if the input format is invalid.
-    """
-    try:
-        chrom, pos, ref, alt = variant_str.split("-")
 
-        if not chrom or not pos or not ref or not alt:
-            return None
+# Columns of SpliceAI scores parsed from VCF file
+SPLICEAI_SCORE_COLUMNS = [
+    "Delta score (acceptor gain)", "Delta score (acceptor loss)",
+    "Delta score (donor gain)", "Delta score (donor loss)",
+    "Delta position (acceptor gain)", "Delta position (acceptor loss)",
+    "Delta position (donor gain)", "Delta position (donor loss)",
+    "Max_Delta_Score",
+]
+# First SpliceAI annotation in VCF INFO field
+_SPLICEAI_INFO_RE = re.compile(r'(?:^|;)SpliceAI=([^;,]*)')
 
-        return chrom, pos, ref, alt
-    except Exception:
-        return None
 
+class SpliceAIError(Exception):
+    """Custom exception for SpliceAI errors."""
 
 
 def write_vcf(dataframe:pd.DataFrame, output_filename:str)-> str:
@@ -73,8 +66,8 @@ def write_vcf(dataframe:pd.DataFrame, output_filename:str)-> str:
 
     This function extracts specific variant information
     from a pandas DataFrame and writes it to a VCF file.
-    For each row, the function extracts the first valid variant value
-    found in these columns, parses it, and writes the corresponding VCF line.
+    Variants are taken from the 'gen_pos' column, values
+    that aren't in the `chrom-pos-ref-alt` format are skipped.
 
     Args:
         dataframe (pd.DataFrame): The DataFrame containing the variant data.
@@ -91,20 +84,10 @@ def write_vcf(dataframe:pd.DataFrame, output_filename:str)-> str:
         "##contig=<ID=6,length=171115067>\n"
         "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n"
     )
-    with open(output_filename, 'w') as f:
+    with open(output_filename, 'w', buffering=VCF_WRITE_BUFFER_SIZE, encoding='utf-8') as f:
         f.write(header)
-        variant_columns = ["gen_pos"]
-        for row in dataframe.itertuples(index=False):
-            variant_value = next(
-                (getattr(row, col) for col in variant_columns if hasattr(row, col)
-                 and pd.notna(getattr(row, col)) and getattr(row, col) != "?"),
-                None
-            )
-            if variant_value:
-                parsed_variant = parse_variant(variant_value)
-                if parsed_variant:
-                    chrom, pos, ref, alt = parsed_variant
-                    f.write(f"{chrom}\t{pos}\t.\t{ref}\t{alt}\t.\t.\t.\n")
+        split_variants(dataframe).to_csv(
+            f, sep='\t', header=False, index=False, lineterminator='\n')
     return output_filename
 
 
@@ -162,103 +145,105 @@ def run_spliceai(input_vcf: str, ouput_vcf: str, fasta: str, annotation="grch38"
         raise SpliceAIError(f"Error running SpliceAI: {exc}") from exc
 
 
-def parse_spliceai_vcf(vcf_file: str)->dict:
+def hash_variants(variants: pd.Series) -> np.ndarray:
+    """
+    Hashes variant identifiers to 64-bit integers.
+
+    Scores are matched to variants by these hashes, so the scores table doesn't have to keep
+    a Python string for every variant. Missing values get the same hash.
+
+    Args:
+        variants (pd.Series): Variant identifiers, e.g. "chr-pos-ref-alt".
+    Returns:
+        np.ndarray: Array of uint64 hashes.
+    """
+    return pd.util.hash_array(variants.to_numpy(dtype=object))
+
+
+def parse_spliceai_vcf(vcf_file: str)->pd.DataFrame:
     """
     Parses a VCF file to extract SpliceAI scores and maps them to genomic variants.
 
     This function reads a VCF file, extracts SpliceAI scores from the INFO field,
-    and stores them in a dictionary using a variant key format: "chromosome-position-ref-alt".
+    and stores them in a DataFrame indexed by hashes of variant keys in format
+    "chromosome-position-ref-alt", see `hash_variants`.
     The extracted scores include delta scores for acceptor/donor gain/loss and their positions.
+    If the variant has multiple annotations, the first one is used. If any of its scores
+    is not a number, all scores of the variant are missing.
     Args:
        vcf_file(str): Path to the VCF file containing SpliceAI annotations.
     Returns:
-        dict: A dictionary where keys are variant identifiers (e.g., "chr-pos-ref-alt")
-        and values are dictionaries of SpliceAI scores.
+        pd.DataFrame: A DataFrame where index contains hashed variant identifiers (e.g.,
+        "chr-pos-ref-alt") and columns are SpliceAI scores listed in `SPLICEAI_SCORE_COLUMNS`.
     Raises:
         ValueError:If the VCF file is not found or an error occurs during parsing.
     """
-    spliceai_scores = {}
     try:
-        with open(vcf_file, 'r', encoding='utf-8') as vcf:
+        # Header lines are only at the beginning of VCF file and pyarrow can't skip them itself
+        skip_rows = 0
+        with open(vcf_file, 'rb') as vcf:
             for line in vcf:
-                if line.startswith('#'):
-                    continue
-                columns = line.strip().split('\t')
-                chrom, pos, ref, alt = columns[0], columns[1], columns[3], columns[4]
-                variant_key = f"{chrom}-{pos}-{ref}-{alt}"
-                info_field = columns[7]
-                info_parts = info_field.split(";")
-                scores = {}
-                for part in info_parts:
-                    if part.startswith("SpliceAI="):
-                        spliceai_values = part.split("=")[1].split("|")
-                        if all(is_valid_number(val) for val in spliceai_values[2:9]):
-                            scores = {
-                                "Delta score (acceptor gain)": float(spliceai_values[2]),
-                                "Delta score (acceptor loss)": float(spliceai_values[3]),
-                                "Delta score (donor gain)": float(spliceai_values[4]),
-                                "Delta score (donor loss)": float(spliceai_values[5]),
-                                "Delta position (acceptor gain)": int(columns[1]) + int(spliceai_values[6]),
-                                "Delta position (acceptor loss)": int(columns[1]) + int(spliceai_values[7]),
-                                "Delta position (donor gain)": int(columns[1]) + int(spliceai_values[8]),
-                                "Delta position (donor loss)": int(columns[1]) + int(spliceai_values[9]),
-                                "Max_Delta_Score": max(float(spliceai_values[2]), float(spliceai_values[3]),
-                                                        float(spliceai_values[4]), float(spliceai_values[5]))
-                            }
-                        else:
-                            scores = {
-                                "Delta score (acceptor gain)": None,
-                                "Delta score (acceptor loss)": None,
-                                "Delta score (donor gain)": None,
-                                "Delta score (donor loss)": None,
-                                "Delta position (acceptor gain)": None,
-                                "Delta position (acceptor loss)": None,
-                                "Delta position (donor gain)": None,
-                                "Delta position (donor loss)": None,
-                                "Max_Delta_Score": None
-                            }
-                        spliceai_scores[variant_key] = scores
-                        break
-        return spliceai_scores
+                if not line.startswith(b'#'):
+                    break
+                skip_rows += 1
+
+        columns = ['CHROM', 'POS', 'ID', 'REF', 'ALT', 'QUAL', 'FILTER', 'INFO']
+        vcf = pa_csv.read_csv(
+            vcf_file,
+            read_options=pa_csv.ReadOptions(skip_rows=skip_rows, column_names=columns),
+            parse_options=pa_csv.ParseOptions(delimiter='\t', quote_char=False),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=['CHROM', 'POS', 'REF', 'ALT', 'INFO'],
+                column_types={column: pa.string() for column in columns}),
+        ).to_pandas()
+
+        spliceai_values = vcf['INFO'].str.extract(_SPLICEAI_INFO_RE, expand=False)
+        annotated = spliceai_values.notna()
+        vcf = vcf[annotated]
+        spliceai_values = spliceai_values[annotated].str.split('|', expand=True)
+        spliceai_values = spliceai_values.reindex(columns=range(10)).apply(
+            pd.to_numeric, errors='coerce')
+        valid = spliceai_values[list(range(2, 9))].notna().all(axis=1)
+
+        deltas = spliceai_values[[2, 3, 4, 5]].where(valid)
+        positions = spliceai_values[[6, 7, 8, 9]].where(valid).add(
+            pd.to_numeric(vcf['POS']), axis=0).astype('Int64')
+        scores = pd.concat([deltas, positions, deltas.max(axis=1)], axis=1)
+        scores.columns = SPLICEAI_SCORE_COLUMNS
+        scores.index = hash_variants(
+            vcf['CHROM'].str.cat([vcf['POS'], vcf['REF'], vcf['ALT']], sep='-'))
+        return scores[~scores.index.duplicated(keep='last')]
     except FileNotFoundError as e:
         raise ValueError(f"VCF file not found: {vcf_file}") from e
     except Exception as e:
         raise SpliceAIError(f"Error reading VCF file {vcf_file}: {e}") from e
 
 
-def is_valid_number(value):
-        """Returns True if the value can be converted to an int or float, else False."""
-        try:
-            float(value)
-            return True
-        except ValueError:
-            return False
-
-
-def merge_spliceai_scores(data:pd.DataFrame,spliceai_scores:dict)-> pd.DataFrame:
+def merge_spliceai_scores(data:pd.DataFrame,spliceai_scores:pd.DataFrame)-> pd.DataFrame:
     """
     Merges SpliceAI scores into a given DataFrame based on variant values.
 
-    This function extracts variant values from the input DataFrame, maps them to corresponding
-    SpliceAI scores from the provided dictionary, and adds the SpliceAI score columns to the DataFrame.
+    This function joins SpliceAI scores to the input DataFrame by its variant values,
+    adding the SpliceAI score columns with `_spliceai` postfix.
     Args:
         data(pd.DataFrame): Input DataFrame containing variant information.
-        spliceai_scores(dict): A dictionary mapping variant values to their corresponding SpliceAI scores.
+        spliceai_scores(pd.DataFrame): SpliceAI scores indexed by hashed variant values, as
+            returned by `parse_spliceai_vcf`.
     Returns:
-        pd.DataFrame: A new DataFrame with SpliceAI score columns merged, maintaining the original data.
+        pd.DataFrame: A new DataFrame with SpliceAI score columns, the given data isn't modified.
     Raises:
         SpliceAIError: If an error occurs during the merging process.
     """
     try:
-        updated_data = data.copy()
-        spliceai_map = updated_data['gen_pos'].map(spliceai_scores)
-        for key in ["Delta score (acceptor gain)", "Delta score (acceptor loss)",
-                    "Delta score (donor gain)", "Delta score (donor loss)",
-                    "Delta position (acceptor gain)", "Delta position (acceptor loss)",
-                    "Delta position (donor gain)", "Delta position (donor loss)",
-                    "Max_Delta_Score"]:
-            updated_data.loc[:, f"{key}_spliceai"] = spliceai_map.apply(lambda x: x.get(key, None) if isinstance(x, dict) else None)
-        updated_data = updated_data.convert_dtypes()
+        spliceai_scores = spliceai_scores.add_suffix('_spliceai')
+        variant_scores = spliceai_scores.reindex(hash_variants(data['gen_pos']))
+        variant_scores.index = data.index
+        # Scores from earlier evaluation are replaced
+        updated_data = pd.concat(
+            [data.drop(columns=spliceai_scores.columns, errors='ignore'), variant_scores], axis=1)
+        # Only added columns are converted, the rest of data keeps its types
+        score_columns = spliceai_scores.columns
+        updated_data[score_columns] = updated_data[score_columns].convert_dtypes()
         return updated_data
     except Exception as e:
         raise SpliceAIError(f"Error merging SpliceAI scores: {e}") from e
@@ -285,9 +270,8 @@ def add_spliceai_eval_columns(data: pd.DataFrame, fasta_path: str,spliceai_dir:s
     """
     spliceai_input_vcf=os.path.join(spliceai_dir, "spliceai_input.vcf")
     spliceai_output_vcf=os.path.join(spliceai_dir, "spliceai_output.vcf")
-    data_copy = data.copy()
-    input_vcf = write_vcf(data_copy,spliceai_input_vcf)
+    input_vcf = write_vcf(data,spliceai_input_vcf)
     run_spliceai(input_vcf,spliceai_output_vcf, fasta_path)
     spliceai_scores = parse_spliceai_vcf(spliceai_output_vcf)
 
-    return merge_spliceai_scores(data_copy,spliceai_scores)
+    return merge_spliceai_scores(data,spliceai_scores)
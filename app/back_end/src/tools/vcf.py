@@ -0,0 +1,43 @@
+""" Module provides VCF helpers shared by CADD and SpliceAI tools. """
+import pandas as pd
+
+
+# Buffer size of written VCF files, so each chunk is flushed in few large writes
+VCF_WRITE_BUFFER_SIZE = 1 << 20
+
+
+def split_variants(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """
+    Splits variant strings of the 'gen_pos' column into VCF columns.
+
+    Variants are expected in the format `chrom-pos-ref-alt` (e.g., `1-123-A-G`).
+    Missing values, "?" and strings not consisting of exactly four non-empty
+    parts are skipped. ID, QUAL, FILTER and INFO columns are filled with ".".
+
+    Args:
+        dataframe (pd.DataFrame): The DataFrame containing the variant data.
+
+    Returns:
+        pd.DataFrame: DataFrame with columns CHROM, POS, ID, REF, ALT, QUAL, FILTER
+        and INFO in the order of variants in the given DataFrame.
+
+    Example:
+        split_variants(pd.DataFrame({"gen_pos": ["1-123-A-G"]}))
+        ->  CHROM  POS ID REF ALT QUAL FILTER INFO
+            1      123 .  A   G   .    .      .
+    """
+    columns = ["CHROM", "POS", "ID", "REF", "ALT", "QUAL", "FILTER", "INFO"]
+    if "gen_pos" not in dataframe.columns:
+        return pd.DataFrame(columns=columns)
+
+    variants = dataframe["gen_pos"].astype("string").dropna()
+    variants = variants[variants.str.count("-").eq(3)]
+    parts = variants.str.split("-", expand=True)
+    if parts.empty:
+        return pd.DataFrame(columns=columns)
+    parts = parts[(parts != "").all(axis=1)]
+
+    return pd.DataFrame({
+        "CHROM": parts[0], "POS": parts[1], "ID": ".", "REF": parts[2], "ALT": parts[3],
+        "QUAL": ".", "FILTER": ".", "INFO": ".",
+    })
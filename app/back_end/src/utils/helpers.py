@@ -5,13 +5,20 @@ structures.
 Functions:
 - socketio_emit_to_user_session: Sends a Socket.IO event to a specific user session. The event data 
     is augmented with a timestamp indicating the current time.
+- socketio_emit_to_user_session_in_background: Sends the same event from a background task without
+    waiting for it. Such events are sent one by one in the order they were scheduled.
 - build_workspace_structure: Recursively builds a dictionary representation of a directory structure 
     for a given workspace. It includes metadata about files and directories and provides a
     hierarchical view of the workspace.
+- require_headers, require_args: Route decorators validating that request headers and query
+    parameters are provided.
+- str_to_bool: Converts query parameter string to boolean.
 
 Dependencies:
 - os: Provides a way to interact with the operating system, including filesystem operations.
 - datetime: Supplies classes for manipulating dates and times.
+- functools: Supplies `wraps` used by route decorators.
+- flask: Supplies `request` and `jsonify` used by route decorators.
 - src.setup.extensions: Contains `socketio` and `socket_manager` used for emitting events and
     managing user sessions in Socket.IO.
 
@@ -33,9 +40,19 @@ above.
 # pylint: disable=import-error
 
 import os
+import queue
+import threading
 from datetime import datetime
+from functools import wraps
 
-from ..setup.extensions import socketio, socket_manager
+from flask import request, jsonify
+
+from ..setup.extensions import logger, socketio, socket_manager
+
+# Events waiting to be sent by the background task, see socketio_emit_to_user_session_in_background
+_background_events = queue.Queue()
+_background_sender_lock = threading.Lock()
+_background_sender_started = threading.Event()
 
 
 def socketio_emit_to_user_session(event, data, uuid, sid):
@@ -68,6 +85,44 @@ def socketio_emit_to_user_session(event, data, uuid, sid):
     )
 
 
+def _send_background_events():
+    """
+    Send scheduled events one by one, so they reach the user in the order they were scheduled.
+    Runs for the lifetime of the worker.
+    """
+    while True:
+        event, data, uuid, sid = _background_events.get()
+        try:
+            socketio_emit_to_user_session(event, data, uuid, sid)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Failed to emit '%s' event: %s", event, e)
+
+
+def socketio_emit_to_user_session_in_background(event, data, uuid, sid):
+    """
+    Emit an event to a specific user session via Socket.IO from a background task.
+
+    The caller doesn't wait for the event to be sent, so e.g. a route can return its response
+    right away. Events are queued and sent by a single background task, in the order they were
+    scheduled. Events emitted directly with `socketio_emit_to_user_session` aren't ordered with
+    them, so a route should use one of the functions for all of its events.
+
+    Args:
+        event (str): The name of the event to emit.
+        data (dict): A dictionary containing the data to send with the event.
+        uuid (str): The unique identifier of the user whose session should receive the event.
+        sid (str): The session ID of the user session to target.
+
+    Returns:
+        None: This function does not return a value.
+    """
+    _background_events.put((event, data, uuid, sid))
+    with _background_sender_lock:
+        if not _background_sender_started.is_set():
+            socketio.start_background_task(_send_background_events)
+            _background_sender_started.set()
+
+
 def build_workspace_structure(path: str, user_workspace_dir):
     """
     Recursively build the directory structure for the workspace.
@@ -127,6 +182,89 @@ def build_workspace_structure(path: str, user_workspace_dir):
     return workspace_structure
 
 
+def _join_names(names):
+    """Join names into a readable list, e.g. "a, b and c"."""
+    if len(names) == 1:
+        return names[0]
+    return ", ".join(names[:-1]) + f" and {names[-1]}"
+
+
+def require_headers(*names):
+    """
+    Route decorator checking that all given headers are provided.
+
+    Header values are passed to the decorated route as keyword arguments with the same names.
+    If any header is missing, a 400 response is returned without calling the route.
+
+    Args:
+        names (str): Names of required headers, e.g. "uuid", "sid".
+
+    Returns:
+        Callable: Decorator for a Flask route.
+    """
+
+    def decorator(route):
+        @wraps(route)
+        def wrapper(*args, **kwargs):
+            headers = request.headers
+            if any(name not in headers for name in names):
+                message = _join_names([name.upper() for name in names])
+                return jsonify({"error": f"{message} headers are required"}), 400
+            for name in names:
+                kwargs[name] = headers.get(name)
+            return route(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def require_args(*names, allow_empty=()):
+    """
+    Route decorator checking that all given query parameters are provided and not empty.
+
+    If any parameter is missing or empty, a 400 response is returned without calling the route.
+
+    Args:
+        names (str): Names of required query parameters.
+        allow_empty (Iterable[str]): Names of required query parameters which may be empty.
+
+    Returns:
+        Callable: Decorator for a Flask route.
+    """
+
+    def decorator(route):
+        @wraps(route)
+        def wrapper(*args, **kwargs):
+            query = request.args
+            if any(
+                name not in query or (not query[name] and name not in allow_empty)
+                for name in names
+            ):
+                message = _join_names([f"'{name}'" for name in names])
+                return jsonify({"error": f"{message} parameters are required"}), 400
+            return route(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def str_to_bool(value):
+    """
+    Converts query parameter string to boolean.
+
+    Flask's `type=bool` treats every non-empty string, including "false", as True.
+
+    Parameters:
+    - value: The string to convert.
+
+    Returns:
+    - bool: True for "true", "1", "yes" and "on" (case insensitive), otherwise False.
+    """
+    return str(value).strip().lower() in ("true", "1", "yes", "on")
+
+
 def is_number(value):
     """
     Checks if the given value can be converted to a float.
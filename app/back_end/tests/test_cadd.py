@@ -0,0 +1,111 @@
+"""
+Tests for Selenium driver pool and CADD output parsing in `src.tools.cadd`.
+"""
+
+# pylint: disable=import-error
+
+import gzip
+
+import pandas as pd
+import pytest
+
+from src.tools import cadd
+
+
+class _Driver:
+    """Web driver replacement recording calls, optionally with a crashed browser."""
+
+    def __init__(self, *_):
+        self.crashed = False
+        self.quit_calls = 0
+
+    def delete_all_cookies(self):
+        """Fails like a driver whose browser is gone."""
+        if self.crashed:
+            raise ConnectionError("browser is gone")
+
+    def quit(self):
+        """Counts calls, failing for a crashed browser."""
+        self.quit_calls += 1
+        if self.crashed:
+            raise ConnectionError("browser is gone")
+
+
+def test_pool_reuses_driver(monkeypatch):
+    """A returned driver is borrowed again instead of starting a new one."""
+    monkeypatch.setattr(cadd, "create_firefox_driver", _Driver)
+
+    with cadd.SeleniumDriverPool(1) as pool:
+        with pool.driver() as first:
+            pass
+        with pool.driver() as second:
+            pass
+
+    assert second is first
+    assert first.quit_calls == 1
+
+
+def test_pool_drops_crashed_driver(monkeypatch):
+    """A crashed driver is dropped without hiding the original error or losing the slot."""
+    monkeypatch.setattr(cadd, "create_firefox_driver", _Driver)
+
+    with cadd.SeleniumDriverPool(1) as pool:
+        with pytest.raises(TimeoutError):
+            with pool.driver() as crashed:
+                crashed.crashed = True
+                raise TimeoutError
+        with pool.driver() as driver:
+            pass
+
+    assert driver is not crashed
+    assert crashed.quit_calls == 1
+    assert driver.quit_calls == 1
+
+
+def test_pool_close_quits_all_drivers(monkeypatch):
+    """Closing the pool quits every driver, even if one of them fails."""
+    monkeypatch.setattr(cadd, "create_firefox_driver", _Driver)
+
+    pool = cadd.SeleniumDriverPool(2)
+    with pool.driver() as first, pool.driver() as second:
+        pass
+    first.crashed = True
+    pool.close()
+
+    assert first.quit_calls == 1
+    assert second.quit_calls == 1
+
+
+def test_cadd_pipeline_requires_gen_pos(tmp_path):
+    """Data without 'gen_pos' column is rejected before any file is written."""
+    data = pd.DataFrame({"hg38_gnomad_format": ["6-100-A-G"]})
+
+    with pytest.raises(ValueError, match="gen_pos"):
+        cadd.cadd_pipeline(data, str(tmp_path))
+
+    assert not list(tmp_path.iterdir())
+
+
+def test_parse_and_merge_tsv(tmp_path):
+    """PHRED scores from gzipped CADD output are added by variant, keeping rows and order."""
+    tsv_path = tmp_path / "GRCh38-v1.7.tsv.gz"
+    with gzip.open(tsv_path, "wt", encoding="utf-8") as f:
+        f.write(
+            "## CADD GRCh38-v1.7\n"
+            "#Chrom\tPos\tRef\tAlt\tRawScore\tPHRED\n"
+            "6\t100\tA\tG\t0.5\t12.3\n"
+            "6\t200\tC\tT\t-0.1\t1.5\n"
+        )
+    data = pd.DataFrame(
+        {"gen_pos": ["6-200-C-T", "6-100-A-G", "6-300-G-A", "?"], "x": [1, 2, 3, 4]}
+    )
+
+    tsv = cadd.parse_tsv(str(tsv_path))
+    merged = cadd.merge_with_tsv(data, tsv)
+
+    pd.testing.assert_frame_equal(
+        tsv, pd.DataFrame({"cadd_gen_position": ["6-100-A-G", "6-200-C-T"], "PHRED": [12.3, 1.5]})
+    )
+    pd.testing.assert_frame_equal(
+        merged, data.assign(PHRED=[1.5, 12.3, float("nan"), float("nan")])
+    )
@@ -0,0 +1,76 @@
+"""
+Tests for request helpers from `src.utils.helpers`.
+"""
+
+# pylint: disable=import-error
+
+import pytest
+from flask import Flask
+
+from src.utils.helpers import require_args, require_headers, str_to_bool
+
+
+@pytest.mark.parametrize("value", ["true", "True", " TRUE ", "1", "yes", "on", True, 1])
+def test_str_to_bool_true(value):
+    """Truthy query parameter values are converted to True."""
+    assert str_to_bool(value) is True
+
+
+@pytest.mark.parametrize("value", ["false", "False", "0", "no", "off", "", "anything", None, 0])
+def test_str_to_bool_false(value):
+    """Other values, including "false", are converted to False."""
+    assert str_to_bool(value) is False
+
+
+def _create_client():
+    """Create test client of an app with routes guarded by both decorators."""
+    app = Flask(__name__)
+
+    @app.route("/headers")
+    @require_headers("uuid", "sid")
+    def headers_route(uuid, sid):
+        return {"uuid": uuid, "sid": sid}
+
+    @app.route("/args")
+    @require_args("source", "override", allow_empty=("override",))
+    def args_route():
+        return {"ok": True}
+
+    return app.test_client()
+
+
+@pytest.mark.parametrize("headers", [{}, {"uuid": "u1"}, {"sid": "s1"}])
+def test_require_headers_missing(headers):
+    """A missing header returns 400 without calling the route."""
+    response = _create_client().get("/headers", headers=headers)
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "UUID and SID headers are required"}
+
+
+def test_require_headers_passes_values():
+    """Header values are passed to the route as keyword arguments."""
+    response = _create_client().get("/headers", headers={"uuid": "u1", "sid": "s1"})
+
+    assert response.status_code == 200
+    assert response.get_json() == {"uuid": "u1", "sid": "s1"}
+
+
+@pytest.mark.parametrize(
+    "query", ["", "?source=lovd", "?override=true", "?source=&override=true"]
+)
+def test_require_args_missing(query):
+    """A missing or empty query parameter returns 400 without calling the route."""
+    response = _create_client().get(f"/args{query}")
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "'source' and 'override' parameters are required"}
+
+
+@pytest.mark.parametrize("query", ["?source=lovd&override=true", "?source=lovd&override="])
+def test_require_args_present(query):
+    """The route is called when all query parameters are given, allowed ones may be empty."""
+    response = _create_client().get(f"/args{query}")
+
+    assert response.status_code == 200
+    assert response.get_json() == {"ok": True}
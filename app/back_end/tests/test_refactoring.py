@@ -0,0 +1,243 @@
+"""
+Tests for parsing and merging data in `src.data.refactoring`.
+"""
+
+# pylint: disable=import-error
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from src.config import Env
+from src.data import refactoring
+from src.data.refactoring import (
+    cache_by_file_stat,
+    convert_hg19_series,
+    infer_column_type,
+    merge_lovd_clinvar,
+    parse_lovd,
+    transform_spdi_to_format,
+)
+
+NAN = float("nan")
+
+LOVD_TEXT = (
+    "### LOVD-version 3000-280 ### Full data download ### To import, do not remove or alter"
+    " this header ###\n"
+    "## Filter: (gene_id = \"EYS\")\n"
+    "# charset = UTF-8\n"
+    "\n"
+    "## Genes ## Do not remove or alter this header ##\n"
+    "\"{{id}}\"\t\"{{name}}\"\n"
+    "\"EYS\"\t\"eyes shut\"\n"
+    "\n"
+    "\n"
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_env_cache():
+    """Clear cached environment values, so each test reads its own environment."""
+    Env.reset_cache()
+    yield
+    Env.reset_cache()
+
+
+def _counting_reader(maxsize=None):
+    """Create a cached file reader, which counts how many times the file was actually read."""
+    calls = []
+
+    @cache_by_file_stat(maxsize)
+    def read(path, columns=None):
+        calls.append(path)
+        frame = pd.read_csv(path)
+        return frame if columns is None else frame[columns]
+
+    return read, calls
+
+
+def test_cache_reuses_result_of_unchanged_file(tmp_path):
+    """An unchanged file is parsed once and callers get separate copies."""
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n", encoding="utf-8")
+    read, calls = _counting_reader(maxsize=2)
+
+    first = read(str(path))
+    first["a"] = 0
+    second = read(str(path))
+
+    assert len(calls) == 1
+    assert second["a"].tolist() == [1]
+
+
+def test_cache_key_includes_arguments(tmp_path):
+    """Calls with different arguments are cached separately."""
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n", encoding="utf-8")
+    read, calls = _counting_reader(maxsize=2)
+
+    assert read(str(path), columns=["a"]).columns.tolist() == ["a"]
+    assert read(str(path)).columns.tolist() == ["a", "b"]
+    assert len(calls) == 2
+
+
+def test_cache_invalidated_on_mtime_change(tmp_path):
+    """A file with changed modification time is parsed again."""
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n", encoding="utf-8")
+    read, calls = _counting_reader(maxsize=2)
+    read(str(path))
+
+    path.write_text("a,b\n3,4\n", encoding="utf-8")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert read(str(path))["a"].tolist() == [3]
+    assert len(calls) == 2
+
+
+def test_cache_shared_by_threads(tmp_path):
+    """Concurrent calls with evictions return correct results without errors."""
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"data{i}.csv"
+        path.write_text(f"a\n{i}\n", encoding="utf-8")
+        paths.append(str(path))
+    read, _ = _counting_reader(maxsize=2)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(read, paths * 50))
+
+    assert [result["a"].tolist() for result in results] == [[i] for i in range(4)] * 50
+
+
+def test_cache_disabled_by_environment(tmp_path, monkeypatch):
+    """`PARSE_CACHE_SIZE=0` parses the file on every call."""
+    monkeypatch.setenv("PARSE_CACHE_SIZE", "0")
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n", encoding="utf-8")
+    read, calls = _counting_reader()
+
+    read(str(path))
+    read(str(path))
+
+    assert len(calls) == 2
+
+
+def test_invalid_cache_size(monkeypatch):
+    """An invalid `PARSE_CACHE_SIZE` value raises ValueError."""
+    monkeypatch.setenv("PARSE_CACHE_SIZE", "many")
+
+    with pytest.raises(ValueError):
+        Env.get_parse_cache_size()
+
+
+def test_parse_lovd_saves_tables_on_cache_hit(tmp_path):
+    """Tables are saved on every call, even when the parsed file is taken from cache."""
+    path = tmp_path / "lovd.txt"
+    path.write_text(LOVD_TEXT, encoding="utf-8")
+    first_dir = tmp_path / "first"
+    second_dir = tmp_path / "second"
+    first_dir.mkdir()
+    second_dir.mkdir()
+
+    first = parse_lovd(str(path), save_to=str(first_dir))
+    second = parse_lovd(str(path), save_to=str(second_dir))
+
+    assert second["Genes"]["id"].tolist() == first["Genes"]["id"].tolist() == ["EYS"]
+    assert os.listdir(second_dir) == os.listdir(first_dir) != []
+
+
+@pytest.mark.parametrize(
+    "values, expected",
+    [
+        (["1", "-2", "007"], [1, -2, 7]),
+        (["1.5", "1E-5", "2"], [1.5, 1e-05, 2.0]),
+    ],
+)
+def test_infer_column_type_numbers(values, expected):
+    """Columns of integers and floats are converted to numbers."""
+    assert infer_column_type(pd.Series(values)).tolist() == expected
+
+
+@pytest.mark.parametrize(
+    "values", [["1", "nan"], ["inf", "2.5"], ["1e5", "3"], ["1", ""], ["1", "a"], []]
+)
+def test_infer_column_type_strings(values):
+    """Columns with any value which isn't a plain number are kept as strings."""
+    column = pd.Series(values, dtype=object)
+
+    result = infer_column_type(column)
+
+    assert result.dtype == object
+    assert result.tolist() == values
+
+
+def _convert_coordinate(chromosome, position):
+    """Moves hg19 positions to hg38 by a fixed offset like `LiftOver`, 65000000 is unmapped."""
+    if position == 65000000:
+        return []
+    return [(chromosome, position - 700000, "+", 1)]
+
+
+_LIFTOVER = SimpleNamespace(convert_coordinate=_convert_coordinate)
+
+
+def test_convert_hg19_series(monkeypatch):
+    """hg19 variants are lifted over to hg38, '?' is set where it isn't possible."""
+    monkeypatch.setattr(refactoring, "_LIFTOVER", _LIFTOVER)
+    hg19 = pd.Series(
+        ["g.64140891C>T", "g.100_200del", None, "c.123A>G", "g.64500000G>A", "g.65000000A>G"]
+    )
+
+    assert convert_hg19_series(hg19).tolist() == [
+        "g.63440891C>T", "?", "?", "?", "g.63800000G>A", "?"
+    ]
+
+
+def test_merge_lovd_clinvar(monkeypatch):
+    """LOVD and ClinVar rows are joined by hg38 position, filling transcript names from ClinVar."""
+    monkeypatch.setattr(refactoring, "_LIFTOVER", _LIFTOVER)
+    lovd = pd.DataFrame({
+        "id": [1, 2, 3],
+        "VariantOnGenome/DNA": ["g.64140891C>T", "g.64500000G>A", "g.1_2del"],
+        "VariantOnGenome/DNA/hg38": ["", "g.63800000G>A", ""],
+        "VariantOnTranscript/DNA": ["c.1A>G", None, None],
+        "VariantOnTranscript/Protein": [None, "p.(Arg1Ter)", None],
+    })
+    clinvar = pd.DataFrame({
+        "hg38_ID": ["6-63440891-C-T", "6-63800000-G-A", "6-100-A-G", "6-200-A-G"],
+        "Name": [
+            "NM_001142800.2(EYS):c.9405T>A (p.Tyr3135Ter)",
+            "NM_1(EYS):c.5del",
+            "GRCh38/hg38 6p12.1(chr6:1-2)x1",
+            None,
+        ],
+    })
+
+    merged = merge_lovd_clinvar(lovd, clinvar)
+
+    expected = pd.DataFrame({
+        "id": [NAN, NAN, 1.0, 2.0, 3.0],
+        "VariantOnTranscript/DNA": [NAN, NAN, "c.1A>G", "c.5del", NAN],
+        "VariantOnTranscript/Protein": [NAN, NAN, "p.Tyr3135Ter", "p.(Arg1Ter)", NAN],
+        "hg38_gnomad_format": [NAN, NAN, "6-63440891-C-T", "6-63800000-G-A", "?"],
+        "hg38_ID_clinvar": ["6-100-A-G", "6-200-A-G", "6-63440891-C-T", "6-63800000-G-A", NAN],
+        "malformed": ["GRCh38/hg38 6p12.1(chr6:1-2)x1", None, NAN, NAN, NAN],
+    })
+    pd.testing.assert_frame_equal(merged[expected.columns], expected)
+
+
+def test_transform_spdi_to_format():
+    """SPDI values are formatted as 'chromosome-position-ref-alt', invalid ones are None."""
+    data = pd.DataFrame({
+        "Canonical SPDI": ["NC_000006.12:64140891:C:T", "NC_000006.12:1:AC:", "bad", None, "a:b:c"]
+    })
+
+    result = transform_spdi_to_format(data)
+
+    assert result["hg38_ID"].tolist() == ["6-64140891-C-T", "6-1-AC-", None, None, None]
+    assert result["Canonical SPDI"].tolist()[3] == "None"
@@ -0,0 +1,48 @@
+"""
+Tests for SpliceAI output parsing in `src.tools.spliceai`.
+"""
+
+# pylint: disable=import-error
+
+import pandas as pd
+
+from src.tools.spliceai import merge_spliceai_scores, parse_spliceai_vcf
+
+VCF_TEXT = (
+    "##fileformat=VCFv4.2\n"
+    "##INFO=<ID=SpliceAI>\n"
+    "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n"
+    "6\t100\t.\tA\tG\t.\t.\tSpliceAI=G|EYS|0.01|0.20|0.00|0.50|-3|12|4|-40\n"
+    "6\t200\t.\tC\tT\t.\t.\tSpliceAI=T|EYS|.|.|.|.|.|.|.|.\n"
+    "6\t300\t.\tG\tA\t.\t.\tDP=3\n"
+    "6\t100\t.\tA\tG\t.\t.\tSpliceAI=G|EYS|0.30|0.00|0.10|0.00|1|2|3|4\n"
+)
+
+
+def test_parse_and_merge_spliceai_scores(tmp_path):
+    """Scores are added by variant, the last annotation of a variant is used."""
+    vcf_path = tmp_path / "spliceai_output.vcf"
+    vcf_path.write_text(VCF_TEXT, encoding="utf-8")
+    data = pd.DataFrame(
+        {"gen_pos": ["6-100-A-G", "6-200-C-T", "6-300-G-A", "6-400-T-C"], "x": [1, 2, 3, 4]}
+    )
+
+    merged = merge_spliceai_scores(data, parse_spliceai_vcf(str(vcf_path)))
+
+    def scores(value, dtype):
+        return pd.array([value, None, None, None], dtype=dtype)
+
+    expected = pd.DataFrame({
+        "gen_pos": data["gen_pos"],
+        "x": data["x"],
+        "Delta score (acceptor gain)_spliceai": scores(0.3, "Float64"),
+        "Delta score (acceptor loss)_spliceai": scores(0, "Int64"),
+        "Delta score (donor gain)_spliceai": scores(0.1, "Float64"),
+        "Delta score (donor loss)_spliceai": scores(0, "Int64"),
+        "Delta position (acceptor gain)_spliceai": scores(101, "Int64"),
+        "Delta position (acceptor loss)_spliceai": scores(102, "Int64"),
+        "Delta position (donor gain)_spliceai": scores(103, "Int64"),
+        "Delta position (donor loss)_spliceai": scores(104, "Int64"),
+        "Max_Delta_Score_spliceai": scores(0.3, "Float64"),
+    })
+    pd.testing.assert_frame_equal(merged, expected)
@@ -0,0 +1,84 @@
+"""
+Tests for saving merged data in `src.routes.workspace_merge_route`.
+"""
+
+# pylint: disable=import-error
+
+import pandas as pd
+import pytest
+from flask import Flask
+
+from src.constants import WORKSPACE_MERGE_ROUTE
+from src.routes.workspace_merge_route import _persist_merged, workspace_merge_route_bp
+
+NAN = float("nan")
+
+
+def test_persist_merged_creates_csv(tmp_path):
+    """A new CSV file is written with header and rows."""
+    path = str(tmp_path / "merged.csv")
+    data = pd.DataFrame({"id": [1, 2], "value": [0.5, None]})
+
+    _persist_merged(data, path)
+
+    pd.testing.assert_frame_equal(pd.read_csv(path), data)
+
+
+def test_persist_merged_appends_same_columns(tmp_path):
+    """Rows with the same columns are appended without repeating the header."""
+    path = tmp_path / "merged.csv"
+    first = pd.DataFrame({"id": [1], "value": [0.1]})
+    second = pd.DataFrame({"id": [2], "value": [1e-05]})
+
+    _persist_merged(first, str(path))
+    _persist_merged(second, str(path))
+
+    assert path.read_text(encoding="utf-8").splitlines() == ["id,value", "1,0.1", "2,1e-05"]
+
+
+def test_persist_merged_rewrites_different_columns(tmp_path):
+    """Rows with different columns are combined, keeping columns of both."""
+    path = str(tmp_path / "merged.csv")
+    first = pd.DataFrame({"id": [1], "lovd": ["a"]})
+    second = pd.DataFrame({"id": [2], "gnomad": ["b"]})
+
+    _persist_merged(first, path)
+    _persist_merged(second, path)
+
+    expected = pd.DataFrame({"id": [1, 2], "lovd": ["a", NAN], "gnomad": [NAN, "b"]})
+    pd.testing.assert_frame_equal(pd.read_csv(path), expected)
+
+
+def test_persist_merged_rewrites_parquet(tmp_path):
+    """Parquet files are rewritten with the existing and the new rows."""
+    path = str(tmp_path / "merged.parquet")
+    first = pd.DataFrame({"id": [1], "lovd": ["a"]})
+    second = pd.DataFrame({"id": [2], "gnomad": ["b"]})
+
+    _persist_merged(first, path)
+    _persist_merged(second, path)
+
+    expected = pd.DataFrame({"id": [1, 2], "lovd": ["a", None], "gnomad": [None, "b"]})
+    pd.testing.assert_frame_equal(pd.read_parquet(path), expected)
+
+
+@pytest.mark.parametrize(
+    "route, query",
+    [
+        ("all", "lovdFile=lovd.txt&clinvarFile=&gnomadFile=gnomad.csv"),
+        ("all", "lovdFile=lovd.txt&clinvarFile=clinvar.csv&gnomadFile="),
+        ("lovd_gnomad", "lovdFile=&gnomadFile=gnomad.csv"),
+        ("lovd_clinvar", "lovdFile=lovd.txt&clinvarFile="),
+    ],
+)
+def test_merge_rejects_empty_file_args(route, query):
+    """Empty paths of files required by the merge are rejected before merging."""
+    app = Flask(__name__)
+    app.register_blueprint(workspace_merge_route_bp)
+
+    response = app.test_client().get(
+        f"{WORKSPACE_MERGE_ROUTE}/{route}/merged.csv?override=true&{query}",
+        headers={"uuid": "u1", "sid": "s1"},
+    )
+
+    assert response.status_code == 400